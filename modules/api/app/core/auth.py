@@ -94,6 +94,7 @@ async def get_current_user(
                     else:
                         if real_email: user.email = real_email
                         if real_name: user.name = real_name
+                        user.updated_at = datetime.utcnow()
                     
                     await session.commit()
                     await session.refresh(user)
@@ -0,0 +1,80 @@
+import os
+import uuid
+from typing import Optional
+from sqlalchemy import exists, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.cache import TTLCache
+from app.core.events import bus, BLOCK_CHANGED
+from app.models.generic import UserBlock
+
+BLOCK_CACHE_SIZE = int(os.getenv("BLOCK_CACHE_SIZE", "50000"))
+BLOCK_CACHE_TTL_SECONDS = float(os.getenv("BLOCK_CACHE_TTL_SECONDS", "60"))
+
+class BlockGraph:
+    """
+    Cached, bidirectional view of user_blocks.
+    Each entry holds (users I blocked, users who blocked me) and is loaded with one query.
+    block_user / unblock_user emit BLOCK_CHANGED for both parties, which invalidates every worker.
+    """
+
+    def __init__(self, maxsize: int = BLOCK_CACHE_SIZE, ttl: float = BLOCK_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def _edges(self, session: AsyncSession, user_id: uuid.UUID):
+        edges = self._cache.get(user_id)
+        if edges is None:
+            query = select(UserBlock.blocker_id, UserBlock.blocked_id).where(
+                or_(UserBlock.blocker_id == user_id, UserBlock.blocked_id == user_id)
+            )
+            outgoing, incoming = set(), set()
+            for blocker_id, blocked_id in (await session.execute(query)).all():
+                if blocker_id == user_id:
+                    outgoing.add(blocked_id)
+                else:
+                    incoming.add(blocker_id)
+            edges = (frozenset(outgoing), frozenset(incoming))
+            self._cache.set(user_id, edges)
+        return edges
+
+    async def blocked_set(self, session: AsyncSession, user_id: uuid.UUID) -> frozenset:
+        """Everyone `user_id` must not see or interact with, in either direction."""
+        outgoing, incoming = await self._edges(session, user_id)
+        return outgoing | incoming
+
+    async def is_blocked(self, session: AsyncSession, a: Optional[uuid.UUID], b: Optional[uuid.UUID]) -> bool:
+        """True if either user has blocked the other."""
+        if not a or not b or a == b:
+            return False
+        outgoing, incoming = await self._edges(session, a)
+        return b in outgoing or b in incoming
+
+    async def has_blocked(self, session: AsyncSession, blocker_id: Optional[uuid.UUID], blocked_id: Optional[uuid.UUID]) -> bool:
+        """Directional check: has `blocker_id` blocked `blocked_id`?"""
+        if not blocker_id or not blocked_id or blocker_id == blocked_id:
+            return False
+        outgoing, _ = await self._edges(session, blocker_id)
+        return blocked_id in outgoing
+
+    def invalidate(self, *user_ids: uuid.UUID) -> None:
+        for user_id in user_ids:
+            self._cache.pop(user_id)
+
+block_graph = BlockGraph()
+bus.on(BLOCK_CHANGED, lambda data: block_graph.invalidate(*(uuid.UUID(u) for u in data["user_ids"])))
+
+def blocked_between(user_column, viewer_id: uuid.UUID):
+    """SQL EXISTS: true when `user_column` or the viewer has blocked the other."""
+    return exists().where(
+        or_(
+            and_(UserBlock.blocker_id == viewer_id, UserBlock.blocked_id == user_column),
+            and_(UserBlock.blocker_id == user_column, UserBlock.blocked_id == viewer_id)
+        )
+    )
+
+def not_blocked(user_column, viewer_id: uuid.UUID):
+    """
+    SQL anti-join for list queries: keep rows whose author neither blocks nor is blocked by the viewer.
+    Served by the (blocker_id, blocked_id) unique index and ix_user_blocks_blocked_blocker.
+    """
+    return ~blocked_between(user_column, viewer_id)
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import random
+import uuid
+from sqlalchemy import func, update, delete, or_, and_, exists
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.core.scoring import comment_hot_score_sql
+from app.models.generic import Comment, CommentLike, User, UserFollow, UserType, FollowerCountShard
+
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "3600"))
+FOLD_INTERVAL_SECONDS = int(os.getenv("COUNTER_FOLD_INTERVAL_SECONDS", "10"))
+
+# Organizations are verified automatically at this many followers
+INFLUENCE_THRESHOLD = 10000
+# Accounts at or above this many followers take follow deltas in shards instead of their users row
+FOLLOWER_SHARD_THRESHOLD = int(os.getenv("FOLLOWER_SHARD_THRESHOLD", "10000"))
+FOLLOWER_SHARDS = 16
+
+def auto_verified_sql(count_expr):
+    """SQL: is_verified_org once the follower count becomes `count_expr` (verification is never revoked)."""
+    return or_(
+        User.is_verified_org,
+        and_(User.user_type == UserType.ORGANIZATION, count_expr >= INFLUENCE_THRESHOLD)
+    )
+
+async def add_follower(session: AsyncSession, user: User, delta: int) -> int:
+    """
+    Apply a +1/-1 follow delta to `user` in the caller's transaction and return the new count.
+    Most accounts are updated in place (with the auto-verification rule in the same statement);
+    hot accounts get the delta in a random shard, so concurrent follows do not queue on one row.
+    """
+    if (user.follower_count or 0) >= FOLLOWER_SHARD_THRESHOLD:
+        await session.execute(
+            insert(FollowerCountShard)
+            .values(id=uuid.uuid4(), user_id=user.id, shard=random.randrange(FOLLOWER_SHARDS), delta=delta)
+            .on_conflict_do_update(
+                constraint="one_row_per_follower_shard",
+                set_={"delta": FollowerCountShard.delta + delta}
+            )
+        )
+        return await follower_count(session, user)
+    new_count = func.greatest(User.follower_count + delta, 0)
+    return (await session.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(follower_count=new_count, is_verified_org=auto_verified_sql(new_count))
+        .returning(User.follower_count)
+        .execution_options(synchronize_session=False)
+    )).scalar_one()
+
+async def add_following(session: AsyncSession, user_id: uuid.UUID, delta: int) -> None:
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(following_count=func.greatest(User.following_count + delta, 0))
+        .execution_options(synchronize_session=False)
+    )
+
+async def follower_count(session: AsyncSession, user: User) -> int:
+    """follower_count merged with unfolded shard deltas (only hot accounts have any)."""
+    count = user.follower_count or 0
+    if count >= FOLLOWER_SHARD_THRESHOLD:
+        pending = (await session.execute(
+            select(func.sum(FollowerCountShard.delta)).where(FollowerCountShard.user_id == user.id)
+        )).scalar()
+        count += pending or 0
+    return max(count, 0)
+
+def follower_count_sql():
+    """SQL: users.follower_count merged with unfolded shard deltas, for use inside a users query."""
+    pending = (
+        select(func.coalesce(func.sum(FollowerCountShard.delta), 0))
+        .where(FollowerCountShard.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    return func.greatest(User.follower_count + pending, 0)
+
+async def fold_follower_shards(session: AsyncSession) -> int:
+    """Move pending shard deltas into users.follower_count. Returns accounts updated."""
+    folded = delete(FollowerCountShard).returning(FollowerCountShard.user_id, FollowerCountShard.delta).cte("folded")
+    sums = (
+        select(folded.c.user_id, func.sum(folded.c.delta).label("delta"))
+        .group_by(folded.c.user_id)
+        .cte("sums")
+    )
+    new_count = func.greatest(User.follower_count + sums.c.delta, 0)
+    stmt = (
+        update(User)
+        .where(User.id == sums.c.user_id)
+        .values(follower_count=new_count, is_verified_org=auto_verified_sql(new_count))
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    return result.rowcount or 0
+
+async def reconcile_comment_like_counts(session: AsyncSession) -> int:
+    """Repair comments whose like_count drifted from comment_likes (and their hot_score). Returns rows fixed."""
+    actual = func.coalesce(
+        select(func.count(CommentLike.id))
+        .where(CommentLike.comment_id == Comment.id)
+        .correlate(Comment)
+        .scalar_subquery(),
+        0
+    )
+    stmt = (
+        update(Comment)
+        .where(Comment.like_count.is_distinct_from(actual))
+        .values(like_count=actual, hot_score=comment_hot_score_sql(Comment.timestamp, actual))
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    return result.rowcount or 0
+
+async def reconcile_follow_counts(session: AsyncSession) -> int:
+    """Repair follower_count / following_count drift. Accounts with unfolded shards are left for the next pass."""
+    followers = (
+        select(func.count(UserFollow.id)).where(UserFollow.followed_id == User.id).correlate(User).scalar_subquery()
+    )
+    following = (
+        select(func.count(UserFollow.id)).where(UserFollow.follower_id == User.id).correlate(User).scalar_subquery()
+    )
+    stmt = (
+        update(User)
+        .where(
+            or_(User.follower_count.is_distinct_from(followers), User.following_count.is_distinct_from(following)),
+            ~exists().where(FollowerCountShard.user_id == User.id)
+        )
+        .values(follower_count=followers, following_count=following)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    return result.rowcount or 0
+
+async def run_fold_loop():
+    """Background task: fold sharded follower deltas into users."""
+    while True:
+        try:
+            async with async_session() as session:
+                await fold_follower_shards(session)
+                await session.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Counters: Fold Error {str(e)}")
+        await asyncio.sleep(FOLD_INTERVAL_SECONDS)
+
+async def run_reconcile_loop():
+    """Background task: periodically repair denormalized counters."""
+    while True:
+        try:
+            async with async_session() as session:
+                fixed = await reconcile_comment_like_counts(session)
+                await session.commit()
+                if fixed:
+                    print(f"Counters: repaired like_count on {fixed} comments")
+                fixed = await reconcile_follow_counts(session)
+                await session.commit()
+                if fixed:
+                    print(f"Counters: repaired follow counts on {fixed} users")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Counters: Reconcile Error {str(e)}")
+        await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
@@ -33,21 +33,157 @@ engine = create_async_engine(
     connect_args=connect_args
 )
 
+# Shared session factory for request handlers and background jobs
+async_session = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+
 async def get_session() -> AsyncSession:
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
         yield session
 
+# Tables whose changes GET /sync serves (see the sync_xid migrations below)
+SYNC_TABLES = ("conversations", "conversation_participants", "messages", "message_likes", "user_follows", "user_blocks", "categories")
+
+# Idempotent schema updates for tables that predate newer columns/indexes.
+# Each runs in its own savepoint so one failure doesn't abort the rest.
+MIGRATIONS = [
+    "ALTER TABLE messages ADD COLUMN IF NOT EXISTS reply_to_id UUID REFERENCES messages(id);",
+    # Proposals feed: decayed signature velocity + keyset indexes per sort mode (seed: migrate_scores.py)
+    "ALTER TABLE categories ADD COLUMN IF NOT EXISTS trending_score DOUBLE PRECISION NOT NULL DEFAULT 0;",
+    "CREATE INDEX IF NOT EXISTS ix_categories_status_created ON categories (status, created_at DESC, id DESC);",
+    "CREATE INDEX IF NOT EXISTS ix_categories_status_signatures ON categories (status, proposal_signatures DESC, id DESC);",
+    "CREATE INDEX IF NOT EXISTS ix_categories_status_trending ON categories (status, trending_score DESC, id DESC);",
+    # Reverse lookup for the block anti-join ("who blocked me")
+    "CREATE INDEX IF NOT EXISTS ix_user_blocks_blocked_blocker ON user_blocks (blocked_id, blocker_id);",
+    # Denormalized comment likes (backfilled by the counters reconcile job)
+    "ALTER TABLE comments ADD COLUMN IF NOT EXISTS like_count INTEGER NOT NULL DEFAULT 0;",
+    "CREATE INDEX IF NOT EXISTS ix_comment_likes_comment ON comment_likes (comment_id);",
+    # Threaded comments: keyset indexes for top-level pages per sort mode, and reply pages (seed: migrate_scores.py)
+    "ALTER TABLE comments ADD COLUMN IF NOT EXISTS hot_score DOUBLE PRECISION NOT NULL DEFAULT 0;",
+    "CREATE INDEX IF NOT EXISTS ix_comments_roots_newest ON comments (category_id, timestamp DESC, id DESC) WHERE parent_id IS NULL;",
+    "CREATE INDEX IF NOT EXISTS ix_comments_roots_top ON comments (category_id, hot_score DESC, id DESC) WHERE parent_id IS NULL;",
+    "CREATE INDEX IF NOT EXISTS ix_comments_parent ON comments (parent_id, timestamp, id);",
+    # Comment search: generated tsvector kept in sync by Postgres (not mapped on the model)
+    "ALTER TABLE comments ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED;",
+    "CREATE INDEX IF NOT EXISTS ix_comments_search ON comments USING GIN (search_vector);",
+    # Inbox: denormalized last message (backfill: migrate_inbox.py)
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_message_id UUID;",
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_message_preview VARCHAR;",
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_message_sender_id UUID;",
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_message_at TIMESTAMP WITHOUT TIME ZONE;",
+    # Read watermarks: per-conversation message sequence (backfill: migrate_read_state.py)
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_seq INTEGER NOT NULL DEFAULT 0;",
+    "ALTER TABLE conversation_participants ADD COLUMN IF NOT EXISTS last_read_seq INTEGER NOT NULL DEFAULT 0;",
+    "ALTER TABLE messages ADD COLUMN IF NOT EXISTS seq INTEGER NOT NULL DEFAULT 0;",
+    # Message history pages and catch-up syncs are range scans on this index
+    "CREATE INDEX IF NOT EXISTS ix_messages_conversation_seq ON messages (conversation_id, seq);",
+    # Soft delete / clear with chunked background purge
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITHOUT TIME ZONE;",
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS cleared_seq INTEGER NOT NULL DEFAULT 0;",
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS purged_seq INTEGER NOT NULL DEFAULT 0;",
+    "CREATE INDEX IF NOT EXISTS ix_conversations_purge_pending ON conversations (id) WHERE deleted_at IS NOT NULL OR purged_seq < cleared_seq;",
+    "CREATE INDEX IF NOT EXISTS ix_message_likes_message ON message_likes (message_id);",
+    "CREATE INDEX IF NOT EXISTS ix_messages_reply_to ON messages (reply_to_id) WHERE reply_to_id IS NOT NULL;",
+    # Canonical DM key. Pairs with exactly one live DM are keyed here; duplicates are merged by migrate_dm_keys.py
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS dm_key VARCHAR;",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_conversations_dm_key ON conversations (dm_key) WHERE deleted_at IS NULL;",
+    """UPDATE conversations c SET dm_key = pairs.dm_key
+       FROM (
+           SELECT p.conversation_id, MIN(p.user_id::text) || ':' || MAX(p.user_id::text) AS dm_key
+           FROM conversation_participants p JOIN conversations pc ON pc.id = p.conversation_id
+           WHERE pc.type = 'DIRECT' AND pc.deleted_at IS NULL
+           GROUP BY p.conversation_id HAVING COUNT(*) = 2
+       ) pairs
+       WHERE c.id = pairs.conversation_id AND c.dm_key IS NULL
+         AND NOT EXISTS (
+             SELECT 1 FROM conversation_participants p2 JOIN conversations c2 ON c2.id = p2.conversation_id
+             WHERE c2.type = 'DIRECT' AND c2.deleted_at IS NULL AND c2.id <> c.id
+             GROUP BY p2.conversation_id
+             HAVING MIN(p2.user_id::text) || ':' || MAX(p2.user_id::text) = pairs.dm_key AND COUNT(*) = 2
+         );""",
+    # Maintained following_count; counters.reconcile_follow_counts backfills it on its first run
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS following_count INTEGER NOT NULL DEFAULT 0;",
+    "CREATE INDEX IF NOT EXISTS ix_user_follows_followed_ts ON user_follows (followed_id, timestamp);",
+    "CREATE INDEX IF NOT EXISTS ix_user_follows_follower_ts ON user_follows (follower_id, timestamp);",
+    # User search: trigram GIN indexes serve ILIKE '%q%' and similarity (%); updated_at feeds the autocomplete index
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (name gin_trgm_ops);",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops);",
+    "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at);",
+    # Delta sync (GET /sync). sync_xid is the writing transaction's id: set by default on insert and
+    # by trigger on update. Rows from before this migration stay NULL and are covered by the client's
+    # initial full load. The column is added without a default so existing rows are not rewritten.
+    """CREATE OR REPLACE FUNCTION touch_sync_xid() RETURNS trigger AS $$
+       BEGIN
+           NEW.sync_xid := pg_current_xact_id();
+           RETURN NEW;
+       END $$ LANGUAGE plpgsql;""",
+    # Who needs to hear about a deletion: the edge's owner, the removed participant, or a like's conversation
+    """CREATE OR REPLACE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+       BEGIN
+           IF TG_TABLE_NAME = 'user_follows' THEN
+               INSERT INTO sync_tombstones (id, kind, row_id, user_id, created_at)
+               VALUES (gen_random_uuid(), 'follow', OLD.id, OLD.follower_id, now() AT TIME ZONE 'utc');
+           ELSIF TG_TABLE_NAME = 'user_blocks' THEN
+               INSERT INTO sync_tombstones (id, kind, row_id, user_id, created_at)
+               VALUES (gen_random_uuid(), 'block', OLD.id, OLD.blocker_id, now() AT TIME ZONE 'utc');
+           ELSIF TG_TABLE_NAME = 'conversation_participants' THEN
+               INSERT INTO sync_tombstones (id, kind, row_id, user_id, created_at)
+               VALUES (gen_random_uuid(), 'conversation', OLD.conversation_id, OLD.user_id, now() AT TIME ZONE 'utc');
+           ELSIF TG_TABLE_NAME = 'message_likes' THEN
+               INSERT INTO sync_tombstones (id, kind, row_id, conversation_id, created_at)
+               SELECT gen_random_uuid(), 'message_like', OLD.id, m.conversation_id, now() AT TIME ZONE 'utc'
+               FROM messages m WHERE m.id = OLD.message_id;
+           END IF;
+           RETURN OLD;
+       END $$ LANGUAGE plpgsql;""",
+    "ALTER TABLE sync_tombstones ADD COLUMN IF NOT EXISTS sync_xid xid8 DEFAULT pg_current_xact_id();",
+    *[
+        statement
+        for table in SYNC_TABLES
+        for statement in (
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS sync_xid xid8;",
+            f"ALTER TABLE {table} ALTER COLUMN sync_xid SET DEFAULT pg_current_xact_id();",
+            f"""DO $$ BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'touch_sync_xid_{table}') THEN
+                    CREATE TRIGGER touch_sync_xid_{table} BEFORE UPDATE ON {table}
+                    FOR EACH ROW EXECUTE FUNCTION touch_sync_xid();
+                END IF;
+            END $$;""",
+        )
+    ],
+    "CREATE INDEX IF NOT EXISTS ix_messages_conversation_sync ON messages (conversation_id, sync_xid);",
+    "CREATE INDEX IF NOT EXISTS ix_message_likes_sync ON message_likes (sync_xid);",
+    "CREATE INDEX IF NOT EXISTS ix_user_follows_follower_sync ON user_follows (follower_id, sync_xid);",
+    "CREATE INDEX IF NOT EXISTS ix_user_blocks_blocker_sync ON user_blocks (blocker_id, sync_xid);",
+    "CREATE INDEX IF NOT EXISTS ix_categories_sync ON categories (sync_xid);",
+    "CREATE INDEX IF NOT EXISTS ix_sync_tombstones_user ON sync_tombstones (user_id, sync_xid) WHERE user_id IS NOT NULL;",
+    "CREATE INDEX IF NOT EXISTS ix_sync_tombstones_conversation ON sync_tombstones (conversation_id, sync_xid) WHERE conversation_id IS NOT NULL;",
+    *[
+        f"""DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'sync_tombstone_{table}') THEN
+                CREATE TRIGGER sync_tombstone_{table} AFTER DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+            END IF;
+        END $$;"""
+        for table in ("user_follows", "user_blocks", "message_likes", "conversation_participants")
+    ],
+    # Activity feed: timeline keyset, pull path for heavily followed actors, fan-out queue
+    "CREATE INDEX IF NOT EXISTS ix_feed_items_owner_ts ON feed_items (owner_id, created_at, activity_id);",
+    "CREATE INDEX IF NOT EXISTS ix_activities_pull ON activities (actor_id, created_at, id) WHERE NOT pushed;",
+    "CREATE INDEX IF NOT EXISTS ix_activities_pending ON activities (created_at) WHERE fanned_out_at IS NULL;",
+]
+
 async def init_db():
+    from sqlalchemy import text
     async with engine.begin() as conn:
         # verifying connection
         await conn.run_sync(SQLModel.metadata.create_all)
         
-        # Migration: Add reply_to_id if it doesn't exist
-        try:
-            from sqlalchemy import text
-            await conn.execute(text("ALTER TABLE messages ADD COLUMN IF NOT EXISTS reply_to_id UUID REFERENCES messages(id);"))
-        except Exception as e:
-            print(f"Migration warning: {e}")
+        for statement in MIGRATIONS:
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(text(statement))
+            except Exception as e:
+                print(f"Migration warning: {e}")
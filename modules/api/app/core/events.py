@@ -0,0 +1,197 @@
+import asyncio
+import inspect
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import text, delete
+from sqlalchemy.future import select
+from app.core.database import engine, async_session
+from app.models.generic import EventSpill
+
+# Cross-worker event bus over Postgres LISTEN/NOTIFY.
+# emit() runs this worker's handlers immediately and queues the event; the publisher batches
+# queued events into pg_notify calls, and every other worker's listener dispatches them to
+# the same handlers. Delivery is best-effort: events are lost while a listener reconnects,
+# which is why caches keep their TTLs and the registry keeps polling.
+
+CHANNEL = "votestar_events"
+WORKER_ID = uuid.uuid4().hex
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7900
+BATCH_SIZE = 200
+BATCH_WINDOW_SECONDS = 0.01
+MAX_PENDING = int(os.getenv("EVENT_BUS_MAX_PENDING", "10000"))
+RECONNECT_DELAY_SECONDS = 2
+SPILL_RETENTION = timedelta(minutes=10)
+
+# Event kinds
+VOTE_CAST = "vote.cast"
+MESSAGE_SENT = "message.sent"
+CONVERSATION_EVENT = "conversation.event"
+MEMBERSHIP_CHANGED = "membership.changed"
+BLOCK_CHANGED = "block.changed"
+CATEGORY_CHANGED = "category.changed"
+CACHE_INVALIDATED = "cache.invalidated"
+
+class EventBus:
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._caches = {}
+        self._outbox: asyncio.Queue = asyncio.Queue(MAX_PENDING)
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self.dropped = 0
+
+    # --- handlers ---
+
+    def on(self, kind: str, handler) -> None:
+        """Register handler(data) for `kind`. Data is always the JSON-decoded payload (ids as strings)."""
+        self._handlers[kind].append(handler)
+
+    def register_cache(self, name: str, cache, key_type=uuid.UUID) -> None:
+        """Make a TTLCache invalidatable across workers via invalidate(name, *keys)."""
+        self._caches[name] = (cache, key_type)
+
+    def _dispatch(self, kind: str, data: dict) -> None:
+        for handler in self._handlers.get(kind, ()):
+            try:
+                result = handler(data)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                print(f"Events: Handler Error {kind} {str(e)}")
+
+    def _invalidate_local(self, data: dict) -> None:
+        entry = self._caches.get(data["cache"])
+        if entry:
+            cache, key_type = entry
+            for key in data["keys"]:
+                cache.pop(key_type(key))
+
+    # --- publishing ---
+
+    def emit(self, kind: str, **data) -> None:
+        """Publish an event. Call after commit; never blocks the request."""
+        encoded = json.dumps({"k": kind, "d": data}, default=str, separators=(",", ":"))
+        self._dispatch(kind, json.loads(encoded)["d"])
+        try:
+            self._outbox.put_nowait(encoded)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def invalidate(self, cache_name: str, *keys) -> None:
+        self.emit(CACHE_INVALIDATED, cache=cache_name, keys=list(keys))
+
+    def _pack(self, events: list, spilled: list) -> list:
+        """Group encoded events into NOTIFY payloads under MAX_PAYLOAD_BYTES; oversized events spill to a table."""
+        prefix = '{"w":"%s","e":[' % WORKER_ID
+        payloads, current, size = [], [], len(prefix) + 2
+        for event in events:
+            length = len(event.encode())
+            if len(prefix) + 2 + length > MAX_PAYLOAD_BYTES:
+                spill_id = uuid.uuid4()
+                spilled.append({"id": spill_id, "payload": event})
+                event = '{"s":"%s"}' % spill_id
+                length = len(event)
+            if current and size + length + 1 > MAX_PAYLOAD_BYTES:
+                payloads.append(prefix + ",".join(current) + "]}")
+                current, size = [], len(prefix) + 2
+            current.append(event)
+            size += length + 1
+        if current:
+            payloads.append(prefix + ",".join(current) + "]}")
+        return payloads
+
+    async def _flush(self, events: list) -> None:
+        spilled = []
+        payloads = self._pack(events, spilled)
+        async with engine.begin() as conn:
+            if spilled:
+                await conn.execute(EventSpill.__table__.insert(), spilled)
+            # One round trip per batch; notifications go out, in order, at commit
+            await conn.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": CHANNEL, "payloads": payloads}
+            )
+
+    async def run_publisher(self) -> None:
+        last_purge = datetime.utcnow()
+        while True:
+            events = [await self._outbox.get()]
+            await asyncio.sleep(BATCH_WINDOW_SECONDS)
+            while len(events) < BATCH_SIZE and not self._outbox.empty():
+                events.append(self._outbox.get_nowait())
+            try:
+                await self._flush(events)
+                if datetime.utcnow() - last_purge > SPILL_RETENTION:
+                    last_purge = datetime.utcnow()
+                    async with async_session() as session:
+                        await session.execute(delete(EventSpill).where(EventSpill.created_at < last_purge - SPILL_RETENTION))
+                        await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.dropped += len(events)
+                print(f"Events: Publish Error {str(e)}")
+
+    # --- consuming ---
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._inbox.put_nowait(payload)
+
+    async def run_listener(self) -> None:
+        """Hold one dedicated LISTEN connection for this worker, reconnecting on failure."""
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    await driver.add_listener(CHANNEL, self._on_notify)
+                    try:
+                        while not driver.is_closed():
+                            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                    finally:
+                        if not driver.is_closed():
+                            await driver.remove_listener(CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Events: Listener Error {str(e)}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _load_spilled(self, spill_id: str):
+        async with async_session() as session:
+            return (await session.execute(
+                select(EventSpill.payload).where(EventSpill.id == uuid.UUID(spill_id))
+            )).scalar_one_or_none()
+
+    async def run_dispatcher(self) -> None:
+        while True:
+            payload = await self._inbox.get()
+            try:
+                envelope = json.loads(payload)
+                if envelope.get("w") == WORKER_ID:
+                    continue  # already dispatched locally by emit()
+                for event in envelope.get("e", ()):
+                    if "s" in event:
+                        spilled = await self._load_spilled(event["s"])
+                        if not spilled:
+                            continue
+                        event = json.loads(spilled)
+                    self._dispatch(event["k"], event["d"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Events: Dispatch Error {str(e)}")
+
+    async def run(self) -> None:
+        """Background task: publisher, listener and dispatcher for this worker."""
+        await asyncio.gather(self.run_publisher(), self.run_listener(), self.run_dispatcher())
+
+bus = EventBus()
+bus.on(CACHE_INVALIDATED, bus._invalidate_local)
+
+def emit_category_changed(category_id: uuid.UUID, status, start_time: datetime, end_time: datetime) -> None:
+    """Tell every worker's registry and caches about a committed category write."""
+    bus.emit(CATEGORY_CHANGED, category_id=category_id, status=status, start_time=start_time, end_time=end_time)
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.models.generic import Activity, FeedItem, User, UserFollow
+
+# Activity kinds
+VOTE = "vote"
+PROPOSAL = "proposal"
+SIGNATURE = "signature"
+COMMENT = "comment"
+
+# Actors with at least this many followers are not fanned out on write; followers pull their activity on read
+FANOUT_THRESHOLD = int(os.getenv("FEED_FANOUT_THRESHOLD", "10000"))
+# Small batches: each activity can write up to FANOUT_THRESHOLD feed items
+FANOUT_BATCH_SIZE = int(os.getenv("FEED_FANOUT_BATCH_SIZE", "20"))
+FANOUT_INTERVAL_SECONDS = float(os.getenv("FEED_FANOUT_INTERVAL_SECONDS", "1"))
+FEED_TIMELINE_SIZE = int(os.getenv("FEED_TIMELINE_SIZE", "500"))
+FEED_RETENTION = timedelta(days=int(os.getenv("FEED_RETENTION_DAYS", "30")))
+TRIM_INTERVAL = timedelta(hours=1)
+# pg_try_advisory_xact_lock key: one worker trims at a time, concurrent attempts skip
+TRIM_LOCK_KEY = 0x66656564  # "feed"
+
+def released_at(kind: str, now: datetime) -> datetime:
+    """
+    When an activity becomes visible; also its feed timestamp. Votes are stamped with the close of
+    their UTC day and held until then, so neither the feed nor the moment an item appears can be
+    matched against the per-minute vote timeseries to recover the candidate.
+    """
+    if kind == VOTE:
+        return now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return now
+
+def record_activity(session: AsyncSession, actor_id: uuid.UUID, kind: str, category_id: uuid.UUID, object_id: Optional[uuid.UUID] = None) -> None:
+    """Queue an activity in the caller's transaction; the fan-out job delivers it once released."""
+    session.add(Activity(
+        actor_id=actor_id, kind=kind, category_id=category_id, object_id=object_id,
+        created_at=released_at(kind, datetime.utcnow())
+    ))
+
+async def fan_out_batch(session: AsyncSession) -> int:
+    """
+    Claim up to FANOUT_BATCH_SIZE released, pending activities and copy them into every follower's timeline
+    with one INSERT ... SELECT over user_follows. Activities of heavily followed actors are only
+    marked, and GET /feed reads them directly. Returns the number of activities handled.
+    """
+    claimed = (await session.execute(
+        select(Activity.id, Activity.actor_id)
+        .where(Activity.fanned_out_at.is_(None), Activity.created_at <= datetime.utcnow())
+        .order_by(Activity.created_at)
+        .limit(FANOUT_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not claimed:
+        return 0
+
+    hot = set((await session.execute(
+        select(User.id).where(User.id.in_({row.actor_id for row in claimed}), User.follower_count >= FANOUT_THRESHOLD)
+    )).scalars().all())
+    push_ids = [row.id for row in claimed if row.actor_id not in hot]
+    if push_ids:
+        stmt = insert(FeedItem).from_select(
+            ["id", "owner_id", "activity_id", "actor_id", "created_at"],
+            select(func.gen_random_uuid(), UserFollow.follower_id, Activity.id, Activity.actor_id, Activity.created_at)
+            .join(UserFollow, UserFollow.followed_id == Activity.actor_id)
+            .where(Activity.id.in_(push_ids))
+        )
+        await session.execute(stmt.on_conflict_do_nothing(index_elements=["owner_id", "activity_id"]))
+
+    await session.execute(
+        update(Activity)
+        .where(Activity.id.in_([row.id for row in claimed]))
+        .values(fanned_out_at=datetime.utcnow(), pushed=Activity.id.in_(push_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return len(claimed)
+
+async def trim_timelines(session: AsyncSession) -> Optional[int]:
+    """
+    Drop feed items past FEED_TIMELINE_SIZE per owner or older than FEED_RETENTION, then expired
+    activities. Returns None without doing anything when another worker holds the trim lock.
+    """
+    if not (await session.execute(select(func.pg_try_advisory_xact_lock(TRIM_LOCK_KEY)))).scalar():
+        return None
+    cutoff = datetime.utcnow() - FEED_RETENTION
+    ranked = (
+        select(FeedItem.id, func.row_number().over(
+            partition_by=FeedItem.owner_id,
+            order_by=(FeedItem.created_at.desc(), FeedItem.activity_id.desc())
+        ).label("rank"))
+        .where(FeedItem.owner_id.in_(
+            select(FeedItem.owner_id).group_by(FeedItem.owner_id).having(func.count() > FEED_TIMELINE_SIZE)
+        ))
+        .subquery()
+    )
+    overflow = await session.execute(
+        delete(FeedItem)
+        .where(FeedItem.id.in_(select(ranked.c.id).where(ranked.c.rank > FEED_TIMELINE_SIZE)))
+        .execution_options(synchronize_session=False)
+    )
+    expired = await session.execute(delete(FeedItem).where(FeedItem.created_at < cutoff))
+    await session.execute(
+        delete(Activity).where(Activity.created_at < cutoff, Activity.fanned_out_at.is_not(None))
+    )
+    return (overflow.rowcount or 0) + (expired.rowcount or 0)
+
+async def run_fanout_loop():
+    """Background task: deliver pending activities into followers' timelines, and trim timelines hourly."""
+    last_trim = None
+    while True:
+        handled = 0
+        try:
+            async with async_session() as session:
+                handled = await fan_out_batch(session)
+                await session.commit()
+            if not last_trim or datetime.utcnow() - last_trim > TRIM_INTERVAL:
+                last_trim = datetime.utcnow()
+                async with async_session() as session:
+                    trimmed = await trim_timelines(session)
+                    await session.commit()
+                if trimmed:
+                    print(f"Feed: trimmed {trimmed} feed items")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Feed: Fan-out Error {str(e)}")
+        # Keep draining while batches come back full
+        if handled < FANOUT_BATCH_SIZE:
+            await asyncio.sleep(FANOUT_INTERVAL_SECONDS)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, update, and_, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.core.events import emit_category_changed
+from app.models.generic import Category, CategoryStatus, CategoryResult, Candidate, Vote
+
+SCHEDULER_INTERVAL_SECONDS = int(os.getenv("LIFECYCLE_INTERVAL_SECONDS", "30"))
+# Closing waits this long past end_time so in-flight ballots commit before the freeze
+CLOSE_GRACE = timedelta(seconds=int(os.getenv("LIFECYCLE_CLOSE_GRACE_SECONDS", "30")))
+CLOSE_BATCH_SIZE = 20
+
+def is_within_voting_window(category: Category, now: Optional[datetime] = None) -> bool:
+    """True when the category is live and `now` falls inside [start_time, end_time)."""
+    now = now or datetime.utcnow()
+    return (
+        category.status == CategoryStatus.ACTIVE
+        and category.start_time <= now < category.end_time
+    )
+
+async def sync_active_flags(session: AsyncSession, now: datetime) -> int:
+    """Flip is_active for ACTIVE categories whose start_time has (or hasn't yet) arrived."""
+    should_be_active = Category.start_time <= now
+    stmt = (
+        update(Category)
+        .where(
+            Category.status == CategoryStatus.ACTIVE,
+            Category.end_time > now,
+            Category.is_active.is_distinct_from(should_be_active)
+        )
+        .values(is_active=should_be_active, updated_at=now)
+    )
+    result = await session.execute(stmt)
+    return result.rowcount or 0
+
+async def freeze_results(session: AsyncSession, category_id: uuid.UUID, now: datetime) -> None:
+    """Write the final per-candidate tally. Existing rows are never touched."""
+    votes = func.count(Vote.id)
+    tally = (
+        select(
+            func.gen_random_uuid(),
+            Candidate.category_id,
+            Candidate.id,
+            Candidate.name,
+            votes,
+            func.row_number().over(order_by=(votes.desc(), Candidate.name)),
+            literal(now, type_=CategoryResult.frozen_at.type)
+        )
+        .outerjoin(Vote, and_(Vote.candidate_id == Candidate.id, Vote.category_id == Candidate.category_id))
+        .where(Candidate.category_id == category_id)
+        .group_by(Candidate.category_id, Candidate.id, Candidate.name)
+    )
+    stmt = insert(CategoryResult).from_select(
+        ["id", "category_id", "candidate_id", "candidate_name", "votes", "rank", "frozen_at"],
+        tally
+    ).on_conflict_do_nothing(index_elements=["category_id", "candidate_id"])
+    await session.execute(stmt)
+
+async def close_due_categories(session: AsyncSession, now: datetime) -> list:
+    """
+    Archive categories past end_time and freeze their results. Returns the closed rows.
+    Rows are claimed with SKIP LOCKED so several workers can run the scheduler safely.
+    """
+    due_query = (
+        select(Category.id)
+        .where(
+            Category.status == CategoryStatus.ACTIVE,
+            Category.end_time <= now - CLOSE_GRACE
+        )
+        .limit(CLOSE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    due_ids = (await session.execute(due_query)).scalars().all()
+
+    for category_id in due_ids:
+        await freeze_results(session, category_id, now)
+
+    if not due_ids:
+        return []
+    closed = await session.execute(
+        update(Category)
+        .where(Category.id.in_(due_ids))
+        .values(status=CategoryStatus.ARCHIVED, is_active=False, updated_at=now)
+        .returning(Category.id, Category.status, Category.start_time, Category.end_time)
+    )
+    return closed.all()
+
+async def get_frozen_results(session: AsyncSession, category_id: uuid.UUID) -> list:
+    """Snapshot rows for a closed category in rank order (empty if never frozen)."""
+    query = (
+        select(CategoryResult)
+        .where(CategoryResult.category_id == category_id)
+        .order_by(CategoryResult.rank)
+    )
+    return (await session.execute(query)).scalars().all()
+
+async def run_scheduler_loop():
+    """Background task: open categories at start_time, close and freeze them at end_time."""
+    while True:
+        try:
+            async with async_session() as session:
+                now = datetime.utcnow()
+                await sync_active_flags(session, now)
+                closed = await close_due_categories(session, now)
+                await session.commit()
+                for row in closed:
+                    emit_category_changed(row.id, row.status, row.start_time, row.end_time)
+                if closed:
+                    print(f"Lifecycle: closed {len(closed)} categories")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Lifecycle: Scheduler Error {str(e)}")
+        await asyncio.sleep(SCHEDULER_INTERVAL_SECONDS)
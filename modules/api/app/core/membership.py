@@ -0,0 +1,66 @@
+import os
+import uuid
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.cache import TTLCache
+from app.core.events import bus, CONVERSATION_EVENT, MEMBERSHIP_CHANGED
+from app.models.generic import Conversation, ConversationParticipant, ConversationRole
+
+MEMBERSHIP_CACHE_SIZE = int(os.getenv("MEMBERSHIP_CACHE_SIZE", "100000"))
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "60"))
+
+class MembershipCache:
+    """
+    Cached (user_id, conversation_id) -> role for live conversations.
+    Only memberships are cached, so a join needs no invalidation; leaving, removal and deletion
+    emit MEMBERSHIP_CHANGED / conversation.deleted, which invalidates every worker. The TTL
+    bounds staleness when an event is lost.
+    """
+
+    def __init__(self, maxsize: int = MEMBERSHIP_CACHE_SIZE, ttl: float = MEMBERSHIP_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def role(self, session: AsyncSession, conversation_id: uuid.UUID, user_id: uuid.UUID) -> Optional[ConversationRole]:
+        """The user's role in the conversation, or None if they are not in it (or it is deleted)."""
+        key = (user_id, conversation_id)
+        role = self._cache.get(key)
+        if role is None:
+            role = (await session.execute(
+                select(ConversationParticipant.role)
+                .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+                .where(
+                    ConversationParticipant.conversation_id == conversation_id,
+                    ConversationParticipant.user_id == user_id,
+                    Conversation.deleted_at.is_(None)
+                )
+            )).scalar_one_or_none()
+            if role is not None:
+                self._cache.set(key, role)
+        return role
+
+    async def is_member(self, session: AsyncSession, conversation_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        return await self.role(session, conversation_id, user_id) is not None
+
+    def invalidate(self, conversation_id: uuid.UUID, *user_ids: uuid.UUID) -> None:
+        """Forget the given members, or every cached member of the conversation when none are given."""
+        if user_ids:
+            for user_id in user_ids:
+                self._cache.pop((user_id, conversation_id))
+            return
+        # Whole-conversation invalidation only happens on delete, so a scan is acceptable
+        for key in self._cache.keys():
+            if key[1] == conversation_id:
+                self._cache.pop(key)
+
+membership = MembershipCache()
+
+def _on_membership_changed(data: dict) -> None:
+    membership.invalidate(uuid.UUID(data["conversation_id"]), *(uuid.UUID(u) for u in data.get("user_ids") or ()))
+
+def _on_conversation_event(data: dict) -> None:
+    if data["type"] == "conversation.deleted":
+        membership.invalidate(uuid.UUID(data["conversation_id"]))
+
+bus.on(MEMBERSHIP_CHANGED, _on_membership_changed)
+bus.on(CONVERSATION_EVENT, _on_conversation_event)
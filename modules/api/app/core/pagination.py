@@ -0,0 +1,50 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response
+
+# List endpoints keep returning plain arrays; the next-page cursor travels in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+def encode_cursor(*values) -> str:
+    """Opaque, URL-safe cursor for the sort key(s) of the last row on a page."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types) -> list:
+    """
+    Decode a cursor produced by encode_cursor, converting each value to the given type
+    (datetime, uuid.UUID, float, int or str). Raises 400 on tampered or stale cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor shape mismatch")
+        decoded = []
+        for value, kind in zip(values, types):
+            if kind is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(kind(value))
+        return decoded
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
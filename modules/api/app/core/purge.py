@@ -0,0 +1,119 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import func, update, delete, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.models.generic import Conversation, ConversationParticipant, Message, MessageLike, SyncTombstone
+
+PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", "10"))
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", "1000"))
+# Bounds one pass so a single huge conversation cannot starve the others
+PURGE_CHUNKS_PER_PASS = 50
+PURGE_CONVERSATIONS_PER_PASS = 20
+# Also the /sync token lifetime: older tokens get a full resync instead of tombstones
+SYNC_TOMBSTONE_RETENTION = timedelta(days=int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30")))
+TOMBSTONE_PRUNE_INTERVAL = timedelta(hours=1)
+
+pending = or_(Conversation.deleted_at.is_not(None), Conversation.purged_seq < Conversation.cleared_seq)
+
+async def purge_chunk(session: AsyncSession, conversation_id: uuid.UUID) -> bool:
+    """
+    Purge up to PURGE_CHUNK_SIZE messages (and their likes) from one deleted or cleared conversation.
+    Progress is stored in purged_seq, so an interrupted purge resumes where it stopped.
+    Returns True when the conversation has nothing left to purge.
+    """
+    claim = (
+        select(Conversation.deleted_at, Conversation.last_seq, Conversation.cleared_seq)
+        .where(Conversation.id == conversation_id, pending)
+        .with_for_update(skip_locked=True)
+    )
+    row = (await session.execute(claim)).first()
+    if not row:
+        return True  # finished, or another worker holds it
+    target_seq = row.last_seq if row.deleted_at else row.cleared_seq
+
+    chunk = (
+        select(Message.id)
+        .where(Message.conversation_id == conversation_id, Message.seq <= target_seq)
+        .order_by(Message.seq, Message.id)
+        .limit(PURGE_CHUNK_SIZE)
+        .scalar_subquery()
+    )
+    await session.execute(delete(MessageLike).where(MessageLike.message_id.in_(chunk)))
+    # Surviving replies to purged messages lose their reply target rather than blocking the delete
+    await session.execute(
+        update(Message)
+        .where(Message.reply_to_id.in_(chunk))
+        .values(reply_to_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    purged = (await session.execute(
+        delete(Message)
+        .where(Message.id.in_(chunk))
+        .returning(Message.seq)
+        .execution_options(synchronize_session=False)
+    )).scalars().all()
+
+    done = len(purged) < PURGE_CHUNK_SIZE
+    if done and row.deleted_at:
+        await session.execute(delete(ConversationParticipant).where(ConversationParticipant.conversation_id == conversation_id))
+        await session.execute(delete(Conversation).where(Conversation.id == conversation_id))
+    else:
+        progress = target_seq if done else max(purged)
+        await session.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(purged_seq=func.greatest(Conversation.purged_seq, progress))
+        )
+    return done
+
+async def purge_pending(max_chunks: int = PURGE_CHUNKS_PER_PASS) -> int:
+    """One purge pass over deleted/cleared conversations. Returns the number of chunks run."""
+    async with async_session() as session:
+        conversation_ids = (await session.execute(
+            select(Conversation.id)
+            .where(pending)
+            .order_by(case((Conversation.deleted_at.is_not(None), 0), else_=1))
+            .limit(PURGE_CONVERSATIONS_PER_PASS)
+        )).scalars().all()
+
+    chunks = 0
+    for conversation_id in conversation_ids:
+        done = False
+        while not done and chunks < max_chunks:
+            # One short transaction per chunk keeps locks and memory bounded
+            async with async_session() as session:
+                done = await purge_chunk(session, conversation_id)
+                await session.commit()
+            chunks += 1
+    return chunks
+
+async def prune_tombstones() -> int:
+    async with async_session() as session:
+        result = await session.execute(
+            delete(SyncTombstone).where(SyncTombstone.created_at < datetime.utcnow() - SYNC_TOMBSTONE_RETENTION)
+        )
+        await session.commit()
+        return result.rowcount
+
+async def run_purge_loop():
+    """Background task: purge deleted and cleared conversations in bounded chunks, and expired sync tombstones."""
+    last_prune = None
+    while True:
+        try:
+            chunks = await purge_pending()
+            if chunks:
+                print(f"Purge: ran {chunks} chunks")
+            if not last_prune or datetime.utcnow() - last_prune > TOMBSTONE_PRUNE_INTERVAL:
+                last_prune = datetime.utcnow()
+                pruned = await prune_tombstones()
+                if pruned:
+                    print(f"Purge: pruned {pruned} sync tombstones")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Purge: Error {str(e)}")
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import uuid
+from collections import defaultdict
+from typing import Optional
+from app.core.events import bus, MESSAGE_SENT, CONVERSATION_EVENT
+
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+
+def user_topic(user_id: uuid.UUID) -> str:
+    return f"user:{user_id}"
+
+def conversation_topic(conversation_id: uuid.UUID) -> str:
+    return f"conversation:{conversation_id}"
+
+class Subscriber:
+    """
+    One live connection's outbox. Bounded: a consumer that falls SEND_QUEUE_SIZE events behind
+    is cut off (queue drained, None enqueued) and must reconnect and resync via after_seq.
+    """
+
+    def __init__(self, maxsize: int = SEND_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.topics: set = set()
+        self.overflowed = False
+
+    def offer(self, payload: str) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+class PubSub:
+    """
+    In-process topic fan-out for the /ws gateway. Events are serialized once per publish and
+    handed to every subscriber's queue without awaiting, so a slow socket never blocks a request.
+    Only reaches sockets held by this worker; routers emit on the event bus and deliver() runs here
+    on every worker.
+    """
+
+    def __init__(self):
+        self._topics = defaultdict(set)
+
+    def subscribe(self, topic: str, subscriber: Subscriber) -> None:
+        self._topics[topic].add(subscriber)
+        subscriber.topics.add(topic)
+
+    def unsubscribe(self, topic: str, subscriber: Subscriber) -> None:
+        subscribers = self._topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._topics[topic]
+        subscriber.topics.discard(topic)
+
+    def unsubscribe_all(self, subscriber: Subscriber) -> None:
+        for topic in list(subscriber.topics):
+            self.unsubscribe(topic, subscriber)
+
+    def extend(self, source: str, topic: str) -> None:
+        """Subscribe everyone currently on `source` to `topic` too (e.g. a user's sockets to a new conversation)."""
+        for subscriber in list(self._topics.get(source, ())):
+            self.subscribe(topic, subscriber)
+
+    def retract(self, source: str, topic: str) -> None:
+        """Inverse of extend: unsubscribe everyone on `source` from `topic`."""
+        for subscriber in list(self._topics.get(source, ())):
+            self.unsubscribe(topic, subscriber)
+
+    def drop(self, topic: str) -> None:
+        for subscriber in list(self._topics.get(topic, ())):
+            self.unsubscribe(topic, subscriber)
+
+    def publish(self, topic: str, event: dict) -> int:
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+        payload = json.dumps(event, default=str)
+        for subscriber in list(subscribers):
+            subscriber.offer(payload)
+        return len(subscribers)
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return len({s for subscribers in self._topics.values() for s in subscribers})
+
+pubsub = PubSub()
+
+def deliver(event: dict) -> None:
+    """Route a gateway event from the bus (any worker) to this worker's sockets."""
+    topic = conversation_topic(event["conversation_id"])
+    kind = event["type"]
+    if kind == "conversation.created":
+        for user_id in event["user_ids"]:
+            pubsub.extend(user_topic(user_id), topic)
+            pubsub.publish(user_topic(user_id), event)
+        return
+    if event.get("private"):
+        pubsub.publish(user_topic(event["user_id"]), event)
+        return
+    if kind == "participants.added":
+        for user_id in event["user_ids"]:
+            pubsub.extend(user_topic(user_id), topic)
+    pubsub.publish(topic, event)
+    if kind == "participants.removed":
+        for user_id in event["user_ids"]:
+            pubsub.retract(user_topic(user_id), topic)
+    elif kind == "conversation.deleted":
+        pubsub.drop(topic)
+
+bus.on(MESSAGE_SENT, deliver)
+bus.on(CONVERSATION_EVENT, deliver)
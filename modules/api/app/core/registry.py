@@ -0,0 +1,179 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.core.lifecycle import is_within_voting_window
+from app.core.events import bus, CATEGORY_CHANGED
+from app.models.generic import Category, Candidate
+
+REFRESH_INTERVAL_SECONDS = int(os.getenv("REGISTRY_REFRESH_INTERVAL_SECONDS", "5"))
+# Every Nth refresh is a full reload, which also drops deleted rows
+FULL_RELOAD_EVERY = 60
+# Negative-cache bound between refreshes
+MAX_MISSING = 10000
+
+class CategoryEntry:
+    """Ballot-relevant view of a category: status, voting window and candidate set."""
+    __slots__ = ("status", "start_time", "end_time", "candidate_ids")
+
+    def __init__(self, status: str, start_time: datetime, end_time: datetime):
+        self.status = status
+        self.start_time = start_time
+        self.end_time = end_time
+        self.candidate_ids = set()
+
+class CategoryRegistry:
+    """
+    In-process map of categories -> candidates + voting windows.
+    Lets cast_vote reject bad ballots in O(1) without touching the database.
+    Loaded at startup, updated by CATEGORY_CHANGED events from any worker, and reconciled by
+    polling `updated_at` / `created_at` watermarks (which also covers events lost in transit).
+    """
+
+    def __init__(self):
+        self._categories = {}
+        # Category ids / (category, candidate) pairs confirmed absent since the last refresh
+        self._missing = set()
+        self._category_watermark: Optional[datetime] = None
+        self._candidate_watermark: Optional[datetime] = None
+        self._refreshes = 0
+
+    def upsert_category(self, category_id: uuid.UUID, status: str, start_time: datetime, end_time: datetime) -> None:
+        entry = self._categories.get(category_id)
+        if entry:
+            entry.status = status
+            entry.start_time = start_time
+            entry.end_time = end_time
+        else:
+            self._categories[category_id] = CategoryEntry(status, start_time, end_time)
+        self._missing.discard(category_id)
+
+    def add_candidate(self, category_id: uuid.UUID, candidate_id: uuid.UUID) -> None:
+        entry = self._categories.get(category_id)
+        if entry:
+            entry.candidate_ids.add(candidate_id)
+
+    def knows(self, category_id: uuid.UUID, candidate_id: uuid.UUID) -> bool:
+        """True when the registry can answer for this ballot without a reload."""
+        if category_id in self._missing or (category_id, candidate_id) in self._missing:
+            return True
+        entry = self._categories.get(category_id)
+        return entry is not None and candidate_id in entry.candidate_ids
+
+    def _remember_missing(self, key) -> None:
+        if len(self._missing) >= MAX_MISSING:
+            self._missing = set()
+        self._missing.add(key)
+
+    def validate_ballot(self, category_id: uuid.UUID, candidate_id: uuid.UUID, now: Optional[datetime] = None) -> None:
+        """Raise an HTTPException for ballots that would fail; return None for valid ones."""
+        entry = self._categories.get(category_id)
+        if not entry:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+        if candidate_id not in entry.candidate_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Candidate does not belong to this category."
+            )
+        if not is_within_voting_window(entry, now):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Voting is not open for this category."
+            )
+
+    def _apply_rows(self, category_rows, candidate_rows) -> None:
+        for row in category_rows:
+            self.upsert_category(row.id, row.status, row.start_time, row.end_time)
+            if not self._category_watermark or row.updated_at > self._category_watermark:
+                self._category_watermark = row.updated_at
+        for row in candidate_rows:
+            self.add_candidate(row.category_id, row.id)
+            if not self._candidate_watermark or row.created_at > self._candidate_watermark:
+                self._candidate_watermark = row.created_at
+
+    async def load(self, session: AsyncSession) -> None:
+        """Full (re)load of every category and candidate."""
+        category_query = select(Category.id, Category.status, Category.start_time, Category.end_time, Category.updated_at)
+        candidate_query = select(Candidate.id, Candidate.category_id, Candidate.created_at)
+        category_rows = (await session.execute(category_query)).all()
+        candidate_rows = (await session.execute(candidate_query)).all()
+
+        self._categories = {}
+        self._missing = set()
+        self._category_watermark = None
+        self._candidate_watermark = None
+        self._apply_rows(category_rows, candidate_rows)
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Pull only rows changed since the last watermark."""
+        self._refreshes += 1
+        if self._refreshes % FULL_RELOAD_EVERY == 0 or self._category_watermark is None:
+            await self.load(session)
+            return
+
+        category_query = select(Category.id, Category.status, Category.start_time, Category.end_time, Category.updated_at)
+        category_query = category_query.where(Category.updated_at >= self._category_watermark)
+        candidate_query = select(Candidate.id, Candidate.category_id, Candidate.created_at)
+        if self._candidate_watermark:
+            candidate_query = candidate_query.where(Candidate.created_at >= self._candidate_watermark)
+
+        category_rows = (await session.execute(category_query)).all()
+        candidate_rows = (await session.execute(candidate_query)).all()
+        self._missing = set()
+        self._apply_rows(category_rows, candidate_rows)
+
+    async def reload_category(self, session: AsyncSession, category_id: uuid.UUID, candidate_id: uuid.UUID) -> None:
+        """
+        Fetch one category written by another worker since the last poll.
+        Misses are remembered until the next refresh so repeated bad ballots stay DB-free.
+        """
+        query = (
+            select(
+                Category.id, Category.status, Category.start_time, Category.end_time,
+                Candidate.id.label("candidate_id")
+            )
+            .outerjoin(Candidate, Candidate.category_id == Category.id)
+            .where(Category.id == category_id)
+        )
+        rows = (await session.execute(query)).all()
+        if not rows:
+            self._categories.pop(category_id, None)
+            self._remember_missing(category_id)
+            return
+
+        first = rows[0]
+        self.upsert_category(first.id, first.status, first.start_time, first.end_time)
+        for row in rows:
+            if row.candidate_id:
+                self.add_candidate(first.id, row.candidate_id)
+        if candidate_id not in self._categories[first.id].candidate_ids:
+            self._remember_missing((category_id, candidate_id))
+
+registry = CategoryRegistry()
+
+def _on_category_changed(data: dict) -> None:
+    registry.upsert_category(
+        uuid.UUID(data["category_id"]),
+        data["status"],
+        datetime.fromisoformat(data["start_time"]),
+        datetime.fromisoformat(data["end_time"])
+    )
+
+bus.on(CATEGORY_CHANGED, _on_category_changed)
+
+async def run_refresh_loop():
+    """Background task: keep the registry in step with the categories table."""
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+        try:
+            async with async_session() as session:
+                await registry.refresh(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Registry: Refresh Error {str(e)}")
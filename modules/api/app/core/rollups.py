@@ -0,0 +1,149 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, literal, literal_column, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.models.generic import Vote, VoteRollup, RollupResolution
+
+# Minute buckets older than this are folded into hourly buckets
+MINUTE_RETENTION = timedelta(hours=int(os.getenv("ROLLUP_MINUTE_RETENTION_HOURS", "48")))
+COMPACTION_INTERVAL_SECONDS = int(os.getenv("ROLLUP_COMPACTION_INTERVAL_SECONDS", "300"))
+
+# Served resolutions and the window returned when the caller gives no `since`
+RESOLUTIONS = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=2),
+    "day": None,
+}
+
+_ROLLUP_KEY = ["category_id", "resolution", "bucket_start", "candidate_id"]
+
+def floor_to_minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+def floor_to_hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+async def record_vote(session: AsyncSession, vote: Vote) -> None:
+    """
+    Bump the minute bucket for a freshly cast vote.
+    Runs inside the caller's transaction so the rollup commits (or rolls back) with the vote.
+    """
+    stmt = insert(VoteRollup).values(
+        id=uuid.uuid4(),
+        category_id=vote.category_id,
+        candidate_id=vote.candidate_id,
+        resolution=RollupResolution.MINUTE.value,
+        bucket_start=floor_to_minute(vote.timestamp),
+        vote_count=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_ROLLUP_KEY,
+        set_={"vote_count": VoteRollup.vote_count + 1}
+    )
+    await session.execute(stmt)
+
+async def compact_rollups(session: AsyncSession, now: Optional[datetime] = None) -> int:
+    """
+    Fold minute buckets past the retention window into hourly buckets.
+    Delete + merge happen in a single statement, so concurrent workers cannot double count.
+    Returns the number of hourly buckets written.
+    """
+    now = now or datetime.utcnow()
+    cutoff = floor_to_hour(now - MINUTE_RETENTION)
+
+    moved = (
+        delete(VoteRollup)
+        .where(
+            VoteRollup.resolution == RollupResolution.MINUTE.value,
+            VoteRollup.bucket_start < cutoff
+        )
+        .returning(VoteRollup.category_id, VoteRollup.candidate_id, VoteRollup.bucket_start, VoteRollup.vote_count)
+        .cte("moved")
+    )
+    hour_bucket = func.date_trunc(literal_column("'hour'"), moved.c.bucket_start)
+    folded = (
+        select(
+            func.gen_random_uuid(),
+            moved.c.category_id,
+            moved.c.candidate_id,
+            literal(RollupResolution.HOUR.value),
+            hour_bucket,
+            func.sum(moved.c.vote_count)
+        )
+        .group_by(moved.c.category_id, moved.c.candidate_id, hour_bucket)
+    )
+    stmt = insert(VoteRollup).from_select(
+        ["id", "category_id", "candidate_id", "resolution", "bucket_start", "vote_count"],
+        folded
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_ROLLUP_KEY,
+        set_={"vote_count": VoteRollup.vote_count + stmt.excluded.vote_count}
+    )
+    result = await session.execute(stmt)
+    return result.rowcount or 0
+
+async def fetch_timeseries(
+    session: AsyncSession,
+    category_id: uuid.UUID,
+    resolution: str,
+    since: datetime
+):
+    """
+    Return (candidate_id, bucket, votes) rows ordered by bucket.
+    Reads only rollup rows, so cost scales with the number of buckets, not votes.
+    """
+    if resolution == "minute":
+        query = (
+            select(
+                VoteRollup.candidate_id,
+                VoteRollup.bucket_start.label("bucket"),
+                VoteRollup.vote_count.label("votes")
+            )
+            .where(
+                VoteRollup.category_id == category_id,
+                VoteRollup.resolution == RollupResolution.MINUTE.value,
+                VoteRollup.bucket_start >= since
+            )
+            .order_by(VoteRollup.bucket_start)
+        )
+    else:
+        # Hourly rows plus not-yet-compacted minute rows, merged per bucket.
+        # Inlined (whitelisted) so SELECT and GROUP BY share one expression.
+        bucket = func.date_trunc(literal_column(f"'{resolution}'"), VoteRollup.bucket_start)
+        query = (
+            select(
+                VoteRollup.candidate_id,
+                bucket.label("bucket"),
+                func.sum(VoteRollup.vote_count).label("votes")
+            )
+            .where(
+                VoteRollup.category_id == category_id,
+                VoteRollup.bucket_start >= since
+            )
+            .group_by(VoteRollup.candidate_id, bucket)
+            .order_by(bucket)
+        )
+    result = await session.execute(query)
+    return result.all()
+
+async def run_compaction_loop():
+    """Background task: periodically compact minute buckets into hours."""
+    while True:
+        try:
+            async with async_session() as session:
+                compacted = await compact_rollups(session)
+                await session.commit()
+                if compacted:
+                    print(f"Rollups: compacted {compacted} hourly buckets")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Rollups: Compaction Error {str(e)}")
+        await asyncio.sleep(COMPACTION_INTERVAL_SECONDS)
@@ -0,0 +1,35 @@
+import math
+from datetime import datetime
+from sqlalchemy import func, extract
+
+# Time-decayed ranking scores are stored in log2 space relative to a fixed epoch:
+# one half-life of recency is worth the same as doubling the engagement.
+# All rows decay at the same rate, so ordering by the stored value is always current.
+SCORE_EPOCH = datetime(2025, 1, 1)
+
+def decay_position(ts: datetime, half_life_hours: float) -> float:
+    """Half-lives elapsed between SCORE_EPOCH and `ts`."""
+    return (ts - SCORE_EPOCH).total_seconds() / 3600 / half_life_hours
+
+def decay_position_sql(ts_column, half_life_hours: float):
+    """SQL twin of decay_position for a timestamp column."""
+    return extract("epoch", ts_column - SCORE_EPOCH) / 3600 / half_life_hours
+
+def log2_sql(expr):
+    return func.ln(expr) / math.log(2)
+
+def log2_add_sql(score_column, position: float):
+    """SQL for log2(2^score + 2^position), computed without overflow."""
+    high = func.greatest(score_column, position)
+    low = func.least(score_column, position)
+    return high + log2_sql(1 + func.power(2.0, low - high))
+
+# Comments "top" sort: each doubling of likes is worth one half-life of recency
+COMMENT_HALF_LIFE_HOURS = 12.0
+
+def comment_hot_score(ts: datetime, like_count: int) -> float:
+    return decay_position(ts, COMMENT_HALF_LIFE_HOURS) + math.log2(1 + like_count)
+
+def comment_hot_score_sql(ts_column, like_count_expr):
+    """SQL twin of comment_hot_score, used when like_count changes in place."""
+    return decay_position_sql(ts_column, COMMENT_HALF_LIFE_HOURS) + log2_sql(1 + like_count_expr)
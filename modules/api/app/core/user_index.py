@@ -0,0 +1,140 @@
+import asyncio
+import os
+import uuid
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.models.generic import User
+
+REFRESH_INTERVAL_SECONDS = int(os.getenv("USER_INDEX_REFRESH_INTERVAL_SECONDS", "5"))
+LOAD_BATCH_SIZE = 50000
+# updated_at is stamped by the app clock before commit, so rows can land behind the watermark;
+# each refresh re-reads this far back (upserts are idempotent)
+REFRESH_OVERLAP = timedelta(seconds=int(os.getenv("USER_INDEX_REFRESH_OVERLAP_SECONDS", "30")))
+# Every Nth refresh is a full reload: is_verified_org is flipped by the follower counters without
+# touching updated_at, so badges are picked up here (about every 10 minutes at the default interval)
+FULL_RELOAD_EVERY = int(os.getenv("USER_INDEX_FULL_RELOAD_EVERY", "120"))
+
+def display_name(name: Optional[str], email: str) -> str:
+    return name or email.split('@')[0]
+
+def _card(user_id: uuid.UUID, name: str, email: str, user_type, is_verified_org: bool) -> dict:
+    # Same shape as the SQL search results
+    return {"id": str(user_id), "name": name, "email": email, "user_type": user_type, "is_verified_org": is_verified_org}
+
+class PrefixIndex:
+    """
+    In-process, sorted index of user display names for autocomplete.
+    Keys are "<lowercased name>\\x00<user id>", so every key is unique and a prefix query is one
+    bisect plus a short forward scan. Each entry carries the card fields, so lookups touch no database.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = {}  # key -> card
+        self._key_by_id = {}  # user id -> key
+        self.loaded = False
+        self._refreshes = 0
+        self._watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def upsert(self, user_id: uuid.UUID, name: Optional[str], email: str, user_type, is_verified_org: bool) -> None:
+        name = display_name(name, email)
+        key = f"{name.lower()}\x00{user_id}"
+        old_key = self._key_by_id.get(user_id)
+        if old_key != key:
+            if old_key is not None:
+                self._remove_key(old_key)
+            insort(self._keys, key)
+            self._key_by_id[user_id] = key
+        self._entries[key] = _card(user_id, name, email, user_type, is_verified_org)
+
+    def _remove_key(self, key: str) -> None:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+        self._entries.pop(key, None)
+
+    def search(self, prefix: str, limit: int, exclude=frozenset()) -> list:
+        """Up to `limit` cards whose display name starts with `prefix` (case-insensitive), alphabetical."""
+        prefix = prefix.lower()
+        results = []
+        i = bisect_left(self._keys, prefix)
+        while i < len(self._keys) and len(results) < limit:
+            key = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            entry = self._entries[key]
+            if entry["id"] not in exclude:
+                results.append(entry)
+            i += 1
+        return results
+
+    def _replace(self, rows) -> None:
+        entries = {}
+        key_by_id = {}
+        for row in rows:
+            name = display_name(row.name, row.email)
+            key = f"{name.lower()}\x00{row.id}"
+            entries[key] = _card(row.id, name, row.email, row.user_type, row.is_verified_org)
+            key_by_id[row.id] = key
+        self._keys = sorted(entries)
+        self._entries = entries
+        self._key_by_id = key_by_id
+
+    async def load(self, session: AsyncSession) -> None:
+        """Full load in keyset batches, then one sort; the index keeps serving the old data until swapped."""
+        rows, last_id, watermark = [], None, None
+        while True:
+            query = (
+                select(User.id, User.name, User.email, User.user_type, User.is_verified_org, User.updated_at)
+                .order_by(User.id)
+                .limit(LOAD_BATCH_SIZE)
+            )
+            if last_id:
+                query = query.where(User.id > last_id)
+            batch = (await session.execute(query)).all()
+            rows.extend(batch)
+            for row in batch:
+                if not watermark or row.updated_at > watermark:
+                    watermark = row.updated_at
+            if len(batch) < LOAD_BATCH_SIZE:
+                break
+            last_id = batch[-1].id
+            await asyncio.sleep(0)  # let requests run between batches
+        self._replace(rows)
+        self._watermark = watermark
+        self.loaded = True
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Apply users created or renamed since the last watermark, minus REFRESH_OVERLAP (served by ix_users_updated_at)."""
+        self._refreshes += 1
+        if not self.loaded or self._refreshes % FULL_RELOAD_EVERY == 0:
+            await self.load(session)
+            return
+        query = select(User.id, User.name, User.email, User.user_type, User.is_verified_org, User.updated_at)
+        if self._watermark:
+            query = query.where(User.updated_at >= self._watermark - REFRESH_OVERLAP)
+        for row in (await session.execute(query)).all():
+            self.upsert(row.id, row.name, row.email, row.user_type, row.is_verified_org)
+            if not self._watermark or row.updated_at > self._watermark:
+                self._watermark = row.updated_at
+
+user_index = PrefixIndex()
+
+async def run_refresh_loop():
+    """Background task: build the autocomplete index, then keep it in step with the users table."""
+    while True:
+        try:
+            async with async_session() as session:
+                await user_index.refresh(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"UserIndex: Refresh Error {str(e)}")
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
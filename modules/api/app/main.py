@@ -1,11 +1,18 @@
 from fastapi import FastAPI
 from dotenv import load_dotenv
+import asyncio
 import os
 
 load_dotenv() # Load variables from .env
 
-from app.routers import votes, categories, proposals, users, relationships, blocks, comments, conversations
-from app.core.database import init_db
+from app.routers import votes, categories, proposals, users, relationships, blocks, comments, conversations, gateway, sync, feed
+from app.core.database import init_db, async_session
+from app.core import rollups, lifecycle, counters, purge
+from app.core.events import bus
+from app.core.registry import registry, run_refresh_loop
+from app.core import user_index
+from app.core import feed as feed_fanout
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 app = FastAPI(
     title="Votestar API",
@@ -13,11 +20,33 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Long-running maintenance loops owned by this worker
+background_tasks = []
+
 @app.on_event("startup")
 async def on_startup():
     # Initialize the Neon DB tables
     await init_db()
 
+    # Warm the ballot registry before serving votes
+    async with async_session() as session:
+        await registry.load(session)
+
+    background_tasks.append(asyncio.create_task(bus.run()))
+    background_tasks.append(asyncio.create_task(run_refresh_loop()))
+    background_tasks.append(asyncio.create_task(rollups.run_compaction_loop()))
+    background_tasks.append(asyncio.create_task(lifecycle.run_scheduler_loop()))
+    background_tasks.append(asyncio.create_task(counters.run_reconcile_loop()))
+    background_tasks.append(asyncio.create_task(counters.run_fold_loop()))
+    background_tasks.append(asyncio.create_task(user_index.run_refresh_loop()))
+    background_tasks.append(asyncio.create_task(purge.run_purge_loop()))
+    background_tasks.append(asyncio.create_task(feed_fanout.run_fanout_loop()))
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for task in background_tasks:
+        task.cancel()
+
 from fastapi.middleware.cors import CORSMiddleware
 
 app.add_middleware(
@@ -26,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 @app.get("/health")
@@ -40,3 +70,6 @@ app.include_router(relationships.router, prefix="/api/v1", tags=["relationships"
 app.include_router(blocks.router, prefix="/api/v1", tags=["blocks"])
 app.include_router(comments.router, prefix="/api/v1", tags=["comments"])
 app.include_router(conversations.router, prefix="/api/v1", tags=["conversations"])
+app.include_router(gateway.router, prefix="/api/v1", tags=["gateway"])
+app.include_router(sync.router, prefix="/api/v1", tags=["sync"])
+app.include_router(feed.router, prefix="/api/v1", tags=["feed"])
@@ -28,7 +28,6 @@ class UserBase(SQLModel):
     # NEW FIELDS
     user_type: UserType = Field(default=UserType.INDIVIDUAL)
     is_verified_org: bool = False
-    follower_count: int = Field(default=0)
     subscription_tier: Optional[str] = Field(default="Free")
     device_fingerprint: str
     # PROFILE ENRICHMENT
@@ -40,6 +39,10 @@ class User(UserBase, table=True):
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Maintained with the follow edge, so kept out of the client-editable UserBase;
+    # hot accounts also have pending deltas in follower_count_shards
+    follower_count: int = Field(default=0)
+    following_count: int = Field(default=0)
 
 class CategoryBase(SQLModel):
     name: str
@@ -57,6 +60,8 @@ class CategoryBase(SQLModel):
 class Category(CategoryBase, table=True):
     __tablename__ = "categories"
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Decayed signature velocity (log2 scale), maintained by sign_proposal
+    trending_score: float = Field(default=0.0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -85,6 +90,33 @@ class Vote(VoteBase, table=True):
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class CategoryResult(SQLModel, table=True):
+    """Final, immutable tally for a closed category. Written once by the lifecycle scheduler."""
+    __tablename__ = "category_results"
+    __table_args__ = (UniqueConstraint("category_id", "candidate_id", name="one_result_per_candidate"),)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    category_id: uuid.UUID = Field(foreign_key="categories.id")
+    candidate_id: uuid.UUID = Field(foreign_key="candidates.id")
+    candidate_name: str
+    votes: int = Field(default=0)
+    rank: int
+    frozen_at: datetime = Field(default_factory=datetime.utcnow)
+
+class RollupResolution(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+
+class VoteRollup(SQLModel, table=True):
+    """Per-candidate vote counts bucketed by minute (recent) or hour (compacted)."""
+    __tablename__ = "vote_rollups"
+    __table_args__ = (UniqueConstraint("category_id", "resolution", "bucket_start", "candidate_id", name="one_rollup_per_bucket"),)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    category_id: uuid.UUID = Field(foreign_key="categories.id")
+    candidate_id: uuid.UUID = Field(foreign_key="candidates.id")
+    resolution: str = Field(default=RollupResolution.MINUTE)
+    bucket_start: datetime
+    vote_count: int = Field(default=0)
+
 class CategoryProposalSignature(SQLModel, table=True):
     __tablename__ = "category_proposal_signatures"
     __table_args__ = (UniqueConstraint("user_id", "category_id", name="one_signature_per_user_per_category"),)
@@ -101,6 +133,15 @@ class UserFollow(SQLModel, table=True):
     followed_id: uuid.UUID = Field(foreign_key="users.id")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class FollowerCountShard(SQLModel, table=True):
+    """Pending follower_count deltas for heavily followed accounts, folded into users by app.core.counters."""
+    __tablename__ = "follower_count_shards"
+    __table_args__ = (UniqueConstraint("user_id", "shard", name="one_row_per_follower_shard"),)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="users.id")
+    shard: int
+    delta: int = Field(default=0)
+
 class UserBlock(SQLModel, table=True):
     __tablename__ = "user_blocks"
     __table_args__ = (UniqueConstraint("blocker_id", "blocked_id", name="one_block_per_pair"),)
@@ -128,6 +169,10 @@ class Comment(SQLModel, table=True):
     parent_id: Optional[uuid.UUID] = Field(default=None, foreign_key="comments.id")
     content: str = Field(max_length=1000)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Denormalized from comment_likes; maintained atomically by toggle_like
+    like_count: int = Field(default=0)
+    # Time-decayed like score for the "top" sort, see app.core.scoring
+    hot_score: float = Field(default=0)
 
 class CommentLike(SQLModel, table=True):
     __tablename__ = "comment_likes"
@@ -153,6 +198,20 @@ class Conversation(SQLModel, table=True):
     name: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # DIRECT only: "<lower user id>:<higher user id>", unique among live conversations
+    dm_key: Optional[str] = None
+    # Denormalized last message for the inbox; maintained by send_message / clear_conversation
+    last_message_id: Optional[uuid.UUID] = None
+    last_message_preview: Optional[str] = None
+    last_message_sender_id: Optional[uuid.UUID] = None
+    last_message_at: Optional[datetime] = None
+    # Highest Message.seq in this conversation; incremented under the row lock by send_message
+    last_seq: int = Field(default=0)
+    # Soft delete / clear: hidden from reads at once, purged in chunks by app.core.purge.
+    # purged_seq is the purge job's progress (messages up to it are gone).
+    deleted_at: Optional[datetime] = None
+    cleared_seq: int = Field(default=0)
+    purged_seq: int = Field(default=0)
 
 class ConversationParticipant(SQLModel, table=True):
     __tablename__ = "conversation_participants"
@@ -163,6 +222,9 @@ class ConversationParticipant(SQLModel, table=True):
     role: ConversationRole = Field(default=ConversationRole.MEMBER)
     joined_at: datetime = Field(default_factory=datetime.utcnow)
     last_read_at: datetime = Field(default_factory=datetime.utcnow)
+    # Read watermark: every message with seq <= last_read_seq is read by this participant.
+    # Unread count = conversation.last_seq - last_read_seq (sending advances your own watermark)
+    last_read_seq: int = Field(default=0)
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
@@ -174,7 +236,10 @@ class Message(SQLModel, table=True):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     is_edited: bool = Field(default=False)
     reply_to_id: Optional[uuid.UUID] = Field(default=None, foreign_key="messages.id")
-    status: str = Field(default="sent")  # sent, delivered, read
+    # Per-conversation sequence number, compared against participants' read watermarks
+    seq: int = Field(default=0)
+    # Legacy columns: read state is derived from ConversationParticipant.last_read_seq
+    status: str = Field(default="sent")
     read_at: Optional[datetime] = Field(default=None)
 
 
@@ -185,3 +250,51 @@ class MessageLike(SQLModel, table=True):
     user_id: uuid.UUID = Field(foreign_key="users.id")
     message_id: uuid.UUID = Field(foreign_key="messages.id")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class EventSpill(SQLModel, table=True):
+    """Event bus payloads too large for NOTIFY; the notification carries only the id. Purged after a few minutes."""
+    __tablename__ = "event_spill"
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    payload: str
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class SyncTombstone(SQLModel, table=True):
+    """
+    Deleted rows for GET /sync, written by a delete trigger (see MIGRATIONS). Audience is `user_id`
+    or every participant of `conversation_id`. Pruned after SYNC_TOMBSTONE_RETENTION.
+    """
+    __tablename__ = "sync_tombstones"
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    kind: str
+    row_id: uuid.UUID
+    user_id: Optional[uuid.UUID] = None
+    conversation_id: Optional[uuid.UUID] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class Activity(SQLModel, table=True):
+    """
+    Something a user did that shows up in their followers' feeds (see app.core.feed). Votes carry
+    the category only, never the candidate, and created_at is the close of their day. `pushed`
+    records whether the fan-out job copied it into followers' feed_items; heavily followed actors
+    are read from here instead.
+    """
+    __tablename__ = "activities"
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    actor_id: uuid.UUID = Field(foreign_key="users.id")
+    kind: str
+    category_id: uuid.UUID = Field(foreign_key="categories.id")
+    # The comment, for kind "comment"
+    object_id: Optional[uuid.UUID] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    fanned_out_at: Optional[datetime] = None
+    pushed: bool = Field(default=False)
+
+class FeedItem(SQLModel, table=True):
+    """A follower's copy of an Activity; trimmed to FEED_TIMELINE_SIZE per owner."""
+    __tablename__ = "feed_items"
+    __table_args__ = (UniqueConstraint("owner_id", "activity_id", name="one_feed_item_per_activity"),)
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    owner_id: uuid.UUID = Field(foreign_key="users.id")
+    activity_id: uuid.UUID = Field(foreign_key="activities.id")
+    actor_id: uuid.UUID
+    created_at: datetime = Field(index=True)
@@ -2,9 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import delete
+from app.core import counters
 from app.core.database import get_session
 from app.core.auth import get_current_user, resolve_user
-from app.models.generic import User, UserBlock
+from app.core.events import bus, BLOCK_CHANGED
+from app.models.generic import User, UserBlock, UserFollow
 import uuid
 from datetime import datetime
 
@@ -26,19 +29,26 @@ async def block_user(
 
     new_block = UserBlock(blocker_id=current_user.id, blocked_id=target_user.id)
     session.add(new_block)
-    
-    # Auto-unfollow both ways
-    from app.models.generic import UserFollow
-    unfollow_query = select(UserFollow).where(
-        ((UserFollow.follower_id == current_user.id) & (UserFollow.followed_id == target_user.id)) |
-        ((UserFollow.follower_id == target_user.id) & (UserFollow.followed_id == current_user.id))
-    )
-    unfollow_res = await session.execute(unfollow_query)
-    for follow in unfollow_res.scalars().all():
-        await session.delete(follow)
 
     try:
+        # Auto-unfollow both ways; counters move in the same transaction as the edges
+        removed = (await session.execute(
+            delete(UserFollow)
+            .where(
+                ((UserFollow.follower_id == current_user.id) & (UserFollow.followed_id == target_user.id)) |
+                ((UserFollow.follower_id == target_user.id) & (UserFollow.followed_id == current_user.id))
+            )
+            .returning(UserFollow.follower_id, UserFollow.followed_id)
+        )).all()
+        users = {current_user.id: current_user, target_user.id: target_user}
+        for follower_id, followed_id in removed:
+            await counters.add_follower(session, users[followed_id], -1)
+            await counters.add_following(session, follower_id, -1)
+
         await session.commit()
+        bus.emit(BLOCK_CHANGED, user_ids=[current_user.id, target_user.id])
+        if removed:
+            bus.invalidate("user_profile", current_user.id, target_user.id)
         return {"status": "blocked", "target_id": target_user.id}
     except IntegrityError:
         await session.rollback()
@@ -70,6 +80,7 @@ async def unblock_user(
     
     await session.delete(block_link)
     await session.commit()
+    bus.emit(BLOCK_CHANGED, user_ids=[current_user.id, target_user.id])
     return {"status": "unblocked"}
 
 @router.get("/me/blocks")
@@ -4,8 +4,11 @@ from sqlalchemy.future import select
 from sqlalchemy import func
 from app.core.database import get_session
 from app.core.auth import get_optional_current_user
-from app.models.generic import Category, Candidate, Vote, User
+from app.core import rollups
+from app.core.lifecycle import get_frozen_results
+from app.models.generic import Category, Candidate, Vote, User, CategoryStatus
 from typing import Optional
+from datetime import datetime
 import uuid
 
 router = APIRouter()
@@ -80,21 +83,37 @@ async def get_leaderboard(
     current_user: Optional[User] = Depends(get_optional_current_user)
 ):
     """Get the current vote counts with user-vote context."""
-    query = (
-        select(
-            Candidate.id,
-            Candidate.name,
-            func.count(Vote.id).label("total_votes")
+    category = await session.get(Category, category_id)
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    # Closed categories are served from the frozen snapshot, never from the live ledger
+    rows = []
+    is_final = False
+    if category.status == CategoryStatus.ARCHIVED:
+        rows = [
+            (result.candidate_id, result.candidate_name, result.votes)
+            for result in await get_frozen_results(session, category_id)
+        ]
+        is_final = bool(rows)
+
+    if not is_final:
+        query = (
+            select(
+                Candidate.id,
+                Candidate.name,
+                func.count(Vote.id).label("total_votes")
+            )
+            .outerjoin(Vote, Candidate.id == Vote.candidate_id)
+            .where(Candidate.category_id == category_id)
+            .group_by(Candidate.id, Candidate.name)
+            .order_by(func.count(Vote.id).desc())
         )
-        .outerjoin(Vote, Candidate.id == Vote.candidate_id)
-        .where(Candidate.category_id == category_id)
-        .group_by(Candidate.id, Candidate.name)
-        .order_by(func.count(Vote.id).desc())
-    )
-    
-    result = await session.execute(query)
-    rows = result.all()
-    total_category_votes = sum(row.total_votes for row in rows)
+
+        result = await session.execute(query)
+        rows = result.all()
+
+    total_category_votes = sum(total_votes for _, _, total_votes in rows)
 
     # Check user's specific vote in this category
     user_voted_candidate_id = None
@@ -107,20 +126,58 @@ async def get_leaderboard(
         user_voted_candidate_id = v_result.scalar_one_or_none()
     
     leaderboard = []
-    for i, row in enumerate(rows):
-        percentage = (row.total_votes / total_category_votes * 100) if total_category_votes > 0 else 0
+    for i, (candidate_id, name, total_votes) in enumerate(rows):
+        percentage = (total_votes / total_category_votes * 100) if total_category_votes > 0 else 0
         leaderboard.append({
             "rank": i + 1,
-            "candidate_id": row.id,
-            "name": row.name,
-            "votes": row.total_votes,
+            "candidate_id": candidate_id,
+            "name": name,
+            "votes": total_votes,
             "percentage": round(percentage, 1),
-            "user_voted_for": row.id == user_voted_candidate_id
+            "user_voted_for": candidate_id == user_voted_candidate_id
         })
         
     return {
         "category_id": category_id,
         "total_votes": total_category_votes,
         "leaderboard": leaderboard,
-        "has_voted": user_voted_candidate_id is not None
+        "has_voted": user_voted_candidate_id is not None,
+        "is_final": is_final
+    }
+
+@router.get("/categories/{category_id}/timeseries")
+async def get_timeseries(
+    category_id: uuid.UUID,
+    resolution: str = "minute",
+    since: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """Per-candidate vote counts bucketed by minute, hour or day, served from the rollups."""
+    if resolution not in rollups.RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported resolution. Use one of: {', '.join(rollups.RESOLUTIONS)}"
+        )
+
+    if since is None:
+        window = rollups.RESOLUTIONS[resolution]
+        since = datetime.utcnow() - window if window else datetime(1970, 1, 1)
+
+    rows = await rollups.fetch_timeseries(session, category_id, resolution, since)
+
+    series = {}
+    for row in rows:
+        series.setdefault(row.candidate_id, []).append({
+            "bucket": row.bucket.isoformat(),
+            "votes": row.votes
+        })
+
+    return {
+        "category_id": category_id,
+        "resolution": resolution,
+        "since": since.isoformat(),
+        "series": [
+            {"candidate_id": candidate_id, "points": points}
+            for candidate_id, points in series.items()
+        ]
     }
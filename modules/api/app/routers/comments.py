@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Response
 from sqlmodel import select, desc
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, exists, update, delete, tuple_, literal_column
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert, TSVECTOR
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from pydantic import BaseModel
+from datetime import datetime
 import uuid
 
 from app.core.database import get_session
+from app.core import feed
 from app.core.auth import get_current_user
-from app.models.generic import User, Category, Comment, UserBlock, CommentLike
+from app.core.block_graph import block_graph, not_blocked
+from app.core.pagination import DEFAULT_PAGE_SIZE, clamp_limit, encode_cursor, decode_cursor, set_next_cursor
+from app.core.scoring import comment_hot_score, comment_hot_score_sql
+from app.models.generic import User, Category, Comment, CommentLike
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
@@ -33,23 +42,21 @@ async def create_comment(
     
     # 3. Check blocking
     if proposal.creator_id:
-        block_check = await session.execute(
-            select(UserBlock).where(
-                UserBlock.blocker_id == proposal.creator_id,
-                UserBlock.blocked_id == current_user.id
-            )
-        )
-        if block_check.scalar_one_or_none():
+        if await block_graph.has_blocked(session, proposal.creator_id, current_user.id):
             raise HTTPException(status_code=403, detail="You are blocked by the proposal creator")
 
     # 4. Create comment
+    now = datetime.utcnow()
     new_comment = Comment(
         user_id=current_user.id,
         category_id=proposal_id,
         content=comment_in.content,
-        parent_id=comment_in.parent_id
+        parent_id=comment_in.parent_id,
+        timestamp=now,
+        hot_score=comment_hot_score(now, 0)
     )
     session.add(new_comment)
+    feed.record_activity(session, current_user.id, feed.COMMENT, proposal_id, new_comment.id)
     await session.commit()
     await session.refresh(new_comment)
     
@@ -62,75 +69,224 @@ async def create_comment(
         "timestamp": new_comment.timestamp.isoformat()
     }
 
+COMMENT_SORTS = ("newest", "top")
+MAX_PREVIEW_REPLIES = 10
+
+def _comment_columns(viewer_id: uuid.UUID):
+    is_liked = exists().where(
+        CommentLike.comment_id == Comment.id,
+        CommentLike.user_id == viewer_id
+    )
+    Child = aliased(Comment)
+    has_replies = exists().where(Child.parent_id == Comment.id)
+    return (
+        Comment,
+        User.email,
+        User.name,
+        User.auth0_sub,
+        is_liked.label("is_liked"),
+        has_replies.label("has_replies")
+    )
+
+def _serialize(row, more_replies: bool = False, replies_cursor: Optional[str] = None) -> dict:
+    c = row.Comment
+    data = {
+        "id": str(c.id),
+        "userId": str(c.user_id),
+        "auth0Sub": row.auth0_sub,
+        "userName": row.name or row.email.split('@')[0],
+        "content": c.content,
+        "timestamp": c.timestamp.isoformat(),
+        "parentId": str(c.parent_id) if c.parent_id else None,
+        "likesCount": c.like_count,
+        "isLiked": row.is_liked,
+        "hasReplies": row.has_replies
+    }
+    if c.parent_id is None:
+        data["moreReplies"] = more_replies
+        data["repliesCursor"] = replies_cursor
+    return data
+
 @router.get("/proposals/{proposal_id}")
 async def get_comments(
     proposal_id: uuid.UUID,
+    response: Response,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    replies: int = 3,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    # List comments for a proposal with user details, filtering out blocked users
-    # And include like counts
-    from sqlalchemy import func
-    
-    # Subquery for like counts
-    likes_subquery = (
-        select(CommentLike.comment_id, func.count(CommentLike.id).label("likes_count"))
-        .group_by(CommentLike.comment_id)
-        .subquery()
+    """
+    One page of top-level comments, each followed by up to `replies` preview replies (oldest first).
+    The response stays a flat list linked by parentId. A top-level comment whose replies were cut off
+    has moreReplies set and a `repliesCursor` for GET /comments/{id}/replies (null: start from the
+    first reply). The next page cursor is in X-Next-Cursor.
+    Blocked authors are filtered in SQL.
+    """
+    if sort not in COMMENT_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(COMMENT_SORTS)}")
+    limit = clamp_limit(limit)
+    replies = max(0, min(replies, MAX_PREVIEW_REPLIES))
+    sort_column = Comment.hot_score if sort == "top" else Comment.timestamp
+
+    # 1. Top-level page, served by ix_comments_roots_newest / ix_comments_roots_top
+    query = (
+        select(*_comment_columns(current_user.id))
+        .join(User, Comment.user_id == User.id)
+        .where(
+            Comment.category_id == proposal_id,
+            Comment.parent_id.is_(None),
+            not_blocked(Comment.user_id, current_user.id)
+        )
+        .order_by(sort_column.desc(), Comment.id.desc())
+        .limit(limit + 1)
     )
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, float if sort == "top" else datetime, uuid.UUID)
+        query = query.where(tuple_(sort_column, Comment.id) < tuple_(last_key, last_id))
+    roots = (await session.execute(query)).all()
+
+    has_more = len(roots) > limit
+    roots = roots[:limit]
+    if has_more:
+        last = roots[-1].Comment
+        set_next_cursor(response, encode_cursor(last.hot_score if sort == "top" else last.timestamp, last.id))
 
-    # Subquery for whether current user liked it
-    user_liked_subquery = (
-        select(CommentLike.comment_id)
-        .where(CommentLike.user_id == (current_user.id if current_user else None))
-        .subquery()
+    # 2. Preview replies for the whole page in one query; N+1 rows per parent tell us whether more exist
+    previews = {}
+    parent_ids = [row.Comment.id for row in roots if row.has_replies]
+    if replies and parent_ids:
+        position = func.row_number().over(
+            partition_by=Comment.parent_id,
+            order_by=(Comment.timestamp, Comment.id)
+        ).label("position")
+        ranked = (
+            select(Comment.id, position)
+            .where(
+                Comment.parent_id.in_(parent_ids),
+                not_blocked(Comment.user_id, current_user.id)
+            )
+            .subquery()
+        )
+        reply_query = (
+            select(*_comment_columns(current_user.id))
+            .join(ranked, ranked.c.id == Comment.id)
+            .join(User, Comment.user_id == User.id)
+            .where(ranked.c.position <= replies + 1)
+            .order_by(Comment.parent_id, Comment.timestamp, Comment.id)
+        )
+        for row in (await session.execute(reply_query)).all():
+            previews.setdefault(row.Comment.parent_id, []).append(row)
+
+    result = []
+    for row in roots:
+        shown = previews.get(row.Comment.id, [])
+        more_replies = len(shown) > replies or (row.has_replies and not replies)
+        shown = shown[:replies]
+        replies_cursor = encode_cursor(shown[-1].Comment.timestamp, shown[-1].Comment.id) if more_replies and shown else None
+        result.append(_serialize(row, more_replies, replies_cursor))
+        result.extend(_serialize(reply) for reply in shown)
+    return result
+
+# Generated column from MIGRATIONS; left off the model so ordinary comment loads don't fetch it
+SEARCH_CONFIG = "english"
+search_vector = literal_column("comments.search_vector", type_=TSVECTOR)
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2"
+
+def _html_escaped(column):
+    return func.replace(func.replace(func.replace(column, "&", "&amp;"), "<", "&lt;"), ">", "&gt;")
+
+@router.get("/search")
+async def search_comments(
+    response: Response,
+    q: str,
+    proposal_id: Optional[uuid.UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Full-text search over comments, best match first, optionally within one proposal.
+    `q` accepts web-search syntax ("quoted phrases", OR, -exclude). Each result carries an
+    HTML-escaped `snippet` with matches wrapped in <mark>. Next page cursor is in X-Next-Cursor.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    limit = clamp_limit(limit)
+
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(search_vector, ts_query).label("rank")
+
+    # 1. Rank and page ids only (GIN index); headlines are costly so they run on the page alone
+    page = (
+        select(Comment.id, rank)
+        .where(
+            search_vector.op("@@")(ts_query),
+            not_blocked(Comment.user_id, current_user.id)
+        )
+        .order_by(rank.desc(), Comment.id.desc())
+        .limit(limit + 1)
     )
+    if proposal_id:
+        page = page.where(Comment.category_id == proposal_id)
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, float, uuid.UUID)
+        page = page.where(tuple_(func.ts_rank_cd(search_vector, ts_query), Comment.id) < tuple_(last_rank, last_id))
+    page = page.subquery()
 
+    snippet = func.ts_headline(SEARCH_CONFIG, _html_escaped(Comment.content), ts_query, SEARCH_HEADLINE_OPTIONS)
     query = (
-        select(
-            Comment, 
-            User.email, 
-            User.name, 
-            User.auth0_sub,
-            func.coalesce(likes_subquery.c.likes_count, 0).label("likes_count"),
-            user_liked_subquery.c.comment_id.isnot(None).label("is_liked")
-        )
+        select(*_comment_columns(current_user.id), page.c.rank, snippet.label("snippet"))
+        .join(page, page.c.id == Comment.id)
         .join(User, Comment.user_id == User.id)
-        .outerjoin(likes_subquery, Comment.id == likes_subquery.c.comment_id)
-        .outerjoin(user_liked_subquery, Comment.id == user_liked_subquery.c.comment_id)
-        .where(Comment.category_id == proposal_id)
-        .order_by(desc(Comment.timestamp))
+        .order_by(page.c.rank.desc(), Comment.id.desc())
     )
-    result = await session.execute(query)
-    comments_data = result.all()
-
-    # Get blocked relationships to filter
-    blocked_ids = set()
-    if current_user:
-        # Users I blocked
-        my_blocks = await session.execute(select(UserBlock.blocked_id).where(UserBlock.blocker_id == current_user.id))
-        blocked_ids.update(my_blocks.scalars().all())
-        
-        # Users who blocked me
-        blocks_of_me = await session.execute(select(UserBlock.blocker_id).where(UserBlock.blocked_id == current_user.id))
-        blocked_ids.update(blocks_of_me.scalars().all())
+    rows = (await session.execute(query)).all()
 
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].rank, rows[-1].Comment.id))
     return [
-        {
-            "id": str(c.id),
-            "userId": str(c.user_id),
-            "auth0Sub": auth0_sub,
-            "userName": name or email.split('@')[0],
-            "content": c.content,
-            "timestamp": c.timestamp.isoformat(),
-            "parentId": str(c.parent_id) if c.parent_id else None,
-            "likesCount": likes_count,
-            "isLiked": is_liked
-        }
-        for c, email, name, auth0_sub, likes_count, is_liked in comments_data
-        if c.user_id not in blocked_ids
+        {**_serialize(row), "proposalId": str(row.Comment.category_id), "snippet": row.snippet}
+        for row in rows
     ]
 
+@router.get("/{comment_id}/replies")
+async def get_replies(
+    comment_id: uuid.UUID,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Direct replies to a comment, oldest first, keyset-paginated via X-Next-Cursor."""
+    limit = clamp_limit(limit)
+    query = (
+        select(*_comment_columns(current_user.id))
+        .join(User, Comment.user_id == User.id)
+        .where(
+            Comment.parent_id == comment_id,
+            not_blocked(Comment.user_id, current_user.id)
+        )
+        .order_by(Comment.timestamp, Comment.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        last_ts, last_id = decode_cursor(cursor, datetime, uuid.UUID)
+        query = query.where(tuple_(Comment.timestamp, Comment.id) > tuple_(last_ts, last_id))
+    rows = (await session.execute(query)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1].Comment
+        set_next_cursor(response, encode_cursor(last.timestamp, last.id))
+    return [_serialize(row) for row in rows]
+
 @router.delete("/{comment_id}")
 async def delete_comment(
     comment_id: uuid.UUID,
@@ -154,33 +310,51 @@ async def toggle_like(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Toggle a like on a comment."""
-    # Check if comment exists
-    comment = await session.get(Comment, comment_id)
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
-    
-    # Check if already liked
-    like_query = select(CommentLike).where(
-        CommentLike.user_id == current_user.id,
-        CommentLike.comment_id == comment_id
+    """
+    Toggle a like on a comment.
+    Insert-or-delete of the like and the like_count adjustment run as one statement.
+    """
+    inserted = (
+        insert(CommentLike)
+        .values(id=uuid.uuid4(), user_id=current_user.id, comment_id=comment_id, timestamp=datetime.utcnow())
+        .on_conflict_do_nothing(constraint="one_like_per_user_per_comment")
+        .returning(CommentLike.id)
+        .cte("inserted")
     )
-    result = await session.execute(like_query)
-    existing_like = result.scalar_one_or_none()
-    
-    if existing_like:
-        await session.delete(existing_like)
-        liked = False
-    else:
-        new_like = CommentLike(user_id=current_user.id, comment_id=comment_id)
-        session.add(new_like)
-        liked = True
-        
+    # Only runs when the insert hit the unique constraint, i.e. the like already existed
+    removed = (
+        delete(CommentLike)
+        .where(
+            CommentLike.user_id == current_user.id,
+            CommentLike.comment_id == comment_id,
+            ~exists(select(inserted.c.id))
+        )
+        .returning(CommentLike.id)
+        .cte("removed")
+    )
+    added_count = select(func.count()).select_from(inserted).scalar_subquery()
+    removed_count = select(func.count()).select_from(removed).scalar_subquery()
+    stmt = (
+        update(Comment)
+        .add_cte(inserted, removed)
+        .where(Comment.id == comment_id)
+        .values(
+            like_count=Comment.like_count + added_count - removed_count,
+            hot_score=comment_hot_score_sql(Comment.timestamp, Comment.like_count + added_count - removed_count)
+        )
+        .returning(Comment.like_count, (added_count > 0).label("liked"))
+    )
+
+    try:
+        row = (await session.execute(stmt)).first()
+    except IntegrityError:
+        # FK violation: the comment does not exist
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    if not row:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Comment not found")
+
     await session.commit()
-    
-    # Get total count
-    count_query = select(func.count(CommentLike.id)).where(CommentLike.comment_id == comment_id)
-    count_result = await session.execute(count_query)
-    total_likes = count_result.scalar()
-    
-    return {"liked": liked, "likesCount": total_likes}
+    return {"liked": row.liked, "likesCount": row.like_count}
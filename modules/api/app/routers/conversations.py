@@ -1,24 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, or_, and_, desc, delete, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, or_, and_, desc, delete, update, tuple_, literal, case
+from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy.dialects.postgresql import insert
 from app.core.database import get_session
 from app.core.auth import get_current_user, resolve_user
+from app.core.block_graph import block_graph, not_blocked
+from app.core.events import bus, MESSAGE_SENT, CONVERSATION_EVENT, MEMBERSHIP_CHANGED
+from app.core.membership import membership
+from app.core.pagination import clamp_limit, encode_cursor, decode_cursor, set_next_cursor
 from app.models.generic import (
     User, Conversation, ConversationParticipant, Message, 
-    ConversationType, ConversationRole, UserBlock, MessageLike
+    ConversationType, ConversationRole, MessageLike
 )
 from typing import List, Optional
+from datetime import datetime
+import os
 import uuid
 from pydantic import BaseModel
 
 router = APIRouter()
 
+MAX_GROUP_SIZE = int(os.getenv("MAX_GROUP_SIZE", "10000"))
+# Per request; larger rooms are filled with several bulk-add calls
+MAX_BULK_PARTICIPANTS = 5000
+
+# Deleted conversations disappear from every read immediately; app.core.purge removes the rows later
+not_deleted = Conversation.deleted_at.is_(None)
+
+def dm_key(a: uuid.UUID, b: uuid.UUID) -> str:
+    """Canonical key for the DIRECT conversation between two users (order-independent)."""
+    low, high = sorted((str(a), str(b)))
+    return f"{low}:{high}"
+
 # --- Request Models ---
 class CreateDMRequest(BaseModel):
     recipient_id: str # UUID or Auth0 ID
 
+class CreateGroupRequest(BaseModel):
+    name: str
+    type: ConversationType = ConversationType.GROUP
+    member_ids: List[str] = []
+
+class ParticipantsRequest(BaseModel):
+    user_ids: List[str]
+
 class SendMessageRequest(BaseModel):
     content: str
     reply_to_id: Optional[str] = None
@@ -40,109 +67,288 @@ async def create_or_get_dm(
         raise HTTPException(status_code=400, detail="Cannot message yourself")
 
     # Check for Blocks
-    block_check = select(UserBlock).where(
-        or_(
-            and_(UserBlock.blocker_id == current_user.id, UserBlock.blocked_id == recipient.id),
-            and_(UserBlock.blocker_id == recipient.id, UserBlock.blocked_id == current_user.id)
-        )
-    )
-    if (await session.execute(block_check)).scalar_one_or_none():
+    if await block_graph.is_blocked(session, current_user.id, recipient.id):
          raise HTTPException(status_code=403, detail="Cannot message this user due to blocking settings.")
 
-    # Check if DM exists
-    sub_me = select(ConversationParticipant.conversation_id).where(ConversationParticipant.user_id == current_user.id)
+    # Get-or-create on the canonical pair key: concurrent taps race on the unique index, not on a lookup
+    key = dm_key(current_user.id, recipient.id)
+    now = datetime.utcnow()
+    created = (await session.execute(
+        insert(Conversation)
+        .values(id=uuid.uuid4(), type=ConversationType.DIRECT, dm_key=key, created_at=now, updated_at=now)
+        .on_conflict_do_nothing(index_elements=["dm_key"], index_where=not_deleted)
+        .returning(Conversation.id)
+    )).scalar_one_or_none()
+
+    if not created:
+        existing_id = (await session.execute(
+            select(Conversation.id).where(Conversation.dm_key == key, not_deleted)
+        )).scalar_one()
+        return {"id": str(existing_id), "is_new": False}
+
+    await session.execute(insert(ConversationParticipant).values([
+        {"id": uuid.uuid4(), "conversation_id": created, "user_id": user_id, "role": ConversationRole.ADMIN, "joined_at": now, "last_read_at": now}
+        for user_id in (current_user.id, recipient.id)
+    ]))
+    await session.commit()
+
+    # Attaches both users' live sockets, on every worker, to the new conversation
+    bus.emit(
+        CONVERSATION_EVENT,
+        type="conversation.created",
+        conversation_id=created,
+        user_ids=[current_user.id, recipient.id]
+    )
     
-    query = (
-        select(Conversation)
-        .join(ConversationParticipant, Conversation.id == ConversationParticipant.conversation_id)
-        .where(
-            Conversation.type == ConversationType.DIRECT,
-            ConversationParticipant.user_id == recipient.id,
-            Conversation.id.in_(sub_me)
+    return {"id": str(created), "is_new": True}
+
+
+def parse_user_ids(user_ids: List[str]) -> List[uuid.UUID]:
+    if len(user_ids) > MAX_BULK_PARTICIPANTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_PARTICIPANTS} users per request")
+    try:
+        return list(dict.fromkeys(uuid.UUID(u) for u in user_ids))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user ID format")
+
+async def add_participants(
+    session: AsyncSession,
+    conversation_id: uuid.UUID,
+    user_ids: List[uuid.UUID],
+    added_by: uuid.UUID,
+    read_seq=0
+) -> List[uuid.UUID]:
+    """
+    One INSERT ... SELECT for any number of users: unknown users, users blocked either way with
+    `added_by`, and existing members are skipped. Returns the ids actually added.
+    """
+    if not user_ids:
+        return []
+    now = datetime.utcnow()
+    rows = (
+        select(
+            func.gen_random_uuid(),
+            literal(conversation_id),
+            User.id,
+            literal(ConversationRole.MEMBER, ConversationParticipant.__table__.c.role.type),
+            literal(now),
+            literal(now),
+            literal(read_seq)
         )
+        .where(User.id.in_(user_ids), not_blocked(User.id, added_by))
     )
-    
-    # Use first() instead of scalar_one_or_none() to prevent 500s if duplicates somehow exist
-    existing_conv = (await session.execute(query)).scalars().first()
-    
-    if existing_conv:
-        return {"id": str(existing_conv.id), "is_new": False}
+    stmt = (
+        insert(ConversationParticipant)
+        .from_select(["id", "conversation_id", "user_id", "role", "joined_at", "last_read_at", "last_read_seq"], rows)
+        .on_conflict_do_nothing(index_elements=["conversation_id", "user_id"])
+        .returning(ConversationParticipant.user_id)
+    )
+    return (await session.execute(stmt)).scalars().all()
+
+async def group_for_admin(session: AsyncSession, conversation_id: uuid.UUID, user_id: uuid.UUID) -> Conversation:
+    if await membership.role(session, conversation_id, user_id) != ConversationRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only conversation admins can do this")
+    conv = await session.get(Conversation, conversation_id)
+    if not conv or conv.deleted_at is not None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if conv.type == ConversationType.DIRECT:
+        raise HTTPException(status_code=400, detail="Direct conversations have fixed participants")
+    return conv
+
+@router.post("/conversations/groups", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def create_group(
+    payload: CreateGroupRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create a GROUP or CLIQUE_CONFERENCE room with the caller as admin.
+    Messages are fanned out on read: posting writes one row whatever the room size, and each
+    member's unread state is their read watermark.
+    """
+    if payload.type == ConversationType.DIRECT:
+        raise HTTPException(status_code=400, detail="Use /conversations/dm for direct conversations")
+    name = payload.name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="Name is required")
+    member_ids = [u for u in parse_user_ids(payload.member_ids) if u != current_user.id]
+    if len(member_ids) + 1 > MAX_GROUP_SIZE:
+        raise HTTPException(status_code=400, detail=f"Groups are limited to {MAX_GROUP_SIZE} members")
+
+    conv = Conversation(type=payload.type, name=name)
+    session.add(conv)
+    session.add(ConversationParticipant(conversation_id=conv.id, user_id=current_user.id, role=ConversationRole.ADMIN))
+    await session.flush()
+    added = await add_participants(session, conv.id, member_ids, current_user.id)
+    await session.commit()
 
-    # Create new DM
-    new_conv = Conversation(type=ConversationType.DIRECT)
-    session.add(new_conv)
-    await session.flush() # Get ID
+    bus.emit(
+        CONVERSATION_EVENT,
+        type="conversation.created",
+        conversation_id=conv.id,
+        user_ids=[current_user.id, *added]
+    )
+    return {"id": str(conv.id), "member_count": len(added) + 1}
 
-    part_me = ConversationParticipant(conversation_id=new_conv.id, user_id=current_user.id, role=ConversationRole.ADMIN)
-    part_other = ConversationParticipant(conversation_id=new_conv.id, user_id=recipient.id, role=ConversationRole.ADMIN)
-    
-    session.add(part_me)
-    session.add(part_other)
+@router.post("/conversations/{conversation_id}/participants", response_model=dict)
+async def add_group_participants(
+    conversation_id: str,
+    payload: ParticipantsRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Bulk-add members (admins only). New members start with everything before their join read."""
+    try:
+        conversation_id = uuid.UUID(conversation_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    conv = await group_for_admin(session, conversation_id, current_user.id)
+    user_ids = parse_user_ids(payload.user_ids)
+    member_count = (await session.execute(
+        select(func.count()).where(ConversationParticipant.conversation_id == conversation_id)
+    )).scalar_one()
+    if member_count + len(user_ids) > MAX_GROUP_SIZE:
+        raise HTTPException(status_code=400, detail=f"Groups are limited to {MAX_GROUP_SIZE} members")
+
+    added = await add_participants(session, conversation_id, user_ids, current_user.id, read_seq=conv.last_seq)
     await session.commit()
-    await session.refresh(new_conv)
-    
-    return {"id": str(new_conv.id), "is_new": True}
 
+    if added:
+        bus.emit(CONVERSATION_EVENT, type="participants.added", conversation_id=conversation_id, user_ids=added)
+    return {"added": len(added)}
+
+@router.post("/conversations/{conversation_id}/participants/remove", response_model=dict)
+async def remove_group_participants(
+    conversation_id: str,
+    payload: ParticipantsRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Bulk-remove members. Admins can remove anyone; members can only remove themselves (leave)."""
+    try:
+        conversation_id = uuid.UUID(conversation_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    user_ids = parse_user_ids(payload.user_ids)
+    if user_ids != [current_user.id]:
+        await group_for_admin(session, conversation_id, current_user.id)
+    elif not await membership.is_member(session, conversation_id, current_user.id):
+        raise HTTPException(status_code=403, detail="Not a participant")
+
+    removed = (await session.execute(
+        delete(ConversationParticipant)
+        .where(
+            ConversationParticipant.conversation_id == conversation_id,
+            ConversationParticipant.user_id.in_(user_ids),
+            Conversation.id == conversation_id,
+            Conversation.type != ConversationType.DIRECT
+        )
+        .returning(ConversationParticipant.user_id)
+    )).scalars().all()
+    await session.commit()
+
+    if removed:
+        bus.emit(MEMBERSHIP_CHANGED, conversation_id=conversation_id, user_ids=removed)
+        bus.emit(CONVERSATION_EVENT, type="participants.removed", conversation_id=conversation_id, user_ids=removed)
+    return {"removed": len(removed)}
+
+
+def unread_for(participant=ConversationParticipant):
+    """SQL: messages in the conversation past the participant's read watermark and the clear point."""
+    return func.greatest(Conversation.last_seq - func.greatest(participant.last_read_seq, Conversation.cleared_seq), 0)
+
+def message_status(seq: int, from_me: bool, my_read_seq: int, others_read_seq: Optional[int]) -> str:
+    """Derive read state from watermarks: my messages are read once every other participant passed them."""
+    if from_me:
+        return "read" if others_read_seq is not None and others_read_seq >= seq else "sent"
+    return "read" if my_read_seq >= seq else "sent"
 
 @router.get("/conversations/unread-count")
 async def get_unread_count(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get total unread message count across all conversations."""
-    # Get all conversation IDs where user is participant
-    conv_query = select(ConversationParticipant.conversation_id).where(
-        ConversationParticipant.user_id == current_user.id
-    )
-    conv_ids = (await session.execute(conv_query)).scalars().all()
-    
-    if not conv_ids:
-        return {"unread_count": 0, "conversations_with_unread": 0}
-    
-    # Count unread messages (from others, not read)
-    unread_query = select(func.count()).where(
-        Message.conversation_id.in_(conv_ids),
-        Message.sender_id != current_user.id,
-        Message.status != 'read'
-    )
-    total_unread = (await session.execute(unread_query)).scalar() or 0
-    
-    # Count conversations with unread messages
-    conv_with_unread_query = select(func.count(func.distinct(Message.conversation_id))).where(
-        Message.conversation_id.in_(conv_ids),
-        Message.sender_id != current_user.id,
-        Message.status != 'read'
+    """Get total unread message count across all conversations, from read watermarks."""
+    unread = unread_for()
+    query = (
+        select(
+            func.coalesce(func.sum(unread), 0),
+            func.count().filter(unread > 0)
+        )
+        .select_from(ConversationParticipant)
+        .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+        .where(ConversationParticipant.user_id == current_user.id, not_deleted)
     )
-    conv_with_unread = (await session.execute(conv_with_unread_query)).scalar() or 0
-    
+    total_unread, conv_with_unread = (await session.execute(query)).one()
     return {"unread_count": total_unread, "conversations_with_unread": conv_with_unread}
 
 
+INBOX_PAGE_SIZE = 50
+PREVIEW_LENGTH = 50
+
+def message_preview(content: str) -> str:
+    return content[:PREVIEW_LENGTH] + "..." if len(content) > PREVIEW_LENGTH else content
+
 @router.get("/conversations")
 async def get_inbox(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = INBOX_PAGE_SIZE,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """List all conversations for the current user."""
+    """
+    List conversations for the current user, most recently active first.
+    One query: the last message is denormalized, unread counts and read state come from
+    watermarks, the DM partner is a join.
+    Next page cursor is in X-Next-Cursor.
+    """
+    limit = clamp_limit(limit)
+    Other = aliased(ConversationParticipant)
+    Reader = aliased(ConversationParticipant)
+    # Read receipts are DM-only; in rooms this would scan every member's watermark per row
+    others_read_seq = case((
+        Conversation.type == ConversationType.DIRECT,
+        select(func.min(Reader.last_read_seq))
+        .where(Reader.conversation_id == Conversation.id, Reader.user_id != current_user.id)
+        .correlate(Conversation)
+        .scalar_subquery()
+    ))
     query = (
-        select(Conversation, ConversationParticipant)
+        select(
+            Conversation,
+            unread_for().label("unread_count"),
+            ConversationParticipant.last_read_seq,
+            others_read_seq.label("others_read_seq"),
+            User.id.label("other_user_id"),
+            User.name.label("other_name"),
+            User.email.label("other_email")
+        )
         .join(ConversationParticipant, Conversation.id == ConversationParticipant.conversation_id)
-        .where(ConversationParticipant.user_id == current_user.id)
-        .order_by(Conversation.updated_at.desc())
+        .outerjoin(Other, and_(
+            Conversation.type == ConversationType.DIRECT,
+            Other.conversation_id == Conversation.id,
+            Other.user_id != current_user.id
+        ))
+        .outerjoin(User, User.id == Other.user_id)
+        .where(ConversationParticipant.user_id == current_user.id, not_deleted)
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+        .limit(limit + 1)
     )
-    
+    if cursor:
+        last_updated, last_id = decode_cursor(cursor, datetime, uuid.UUID)
+        query = query.where(tuple_(Conversation.updated_at, Conversation.id) < tuple_(last_updated, last_id))
     results = (await session.execute(query)).all()
-    
+
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1].Conversation
+        set_next_cursor(response, encode_cursor(last.updated_at, last.id))
+
     inbox_items = []
-    for conv, part in results:
-        # Count unread messages (messages from others that aren't read)
-        unread_query = select(func.count()).where(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user.id,
-            Message.status != 'read'
-        )
-        unread_count = (await session.execute(unread_query)).scalar() or 0
-        
+    for conv, unread_count, my_read_seq, others_read_seq, other_user_id, other_name, other_email in results:
         item = {
             "id": conv.id,
             "type": conv.type,
@@ -151,35 +357,18 @@ async def get_inbox(
             "unread_count": unread_count,
             "name": conv.name,
             "avatar": None,
-             # Last message preview could be fetched here or stored on conv
-            "last_message_preview": "View conversation" 
+            "last_message_preview": "View conversation"
         }
-        
-        # Fetch last message content for preview
-        last_msg_query = select(Message).where(Message.conversation_id == conv.id).order_by(Message.timestamp.desc()).limit(1)
-        last_msg = (await session.execute(last_msg_query)).scalar_one_or_none()
-        if last_msg:
-             content = last_msg.content
-             item["last_message_preview"] = content[:50] + "..." if len(content) > 50 else content
-             item["last_message_status"] = last_msg.status
-             item["last_message_is_me"] = last_msg.sender_id == current_user.id
-
-        if conv.type == ConversationType.DIRECT:
-            other_part_query = (
-                select(User)
-                .join(ConversationParticipant, User.id == ConversationParticipant.user_id)
-                .where(
-                    ConversationParticipant.conversation_id == conv.id,
-                    User.id != current_user.id
-                )
-            )
-            other_user = (await session.execute(other_part_query)).scalar_one_or_none()
-            if other_user:
-                item["name"] = other_user.name or other_user.email.split('@')[0]
-                item["other_user_id"] = other_user.id
-        
+        if conv.last_message_id:
+            item["last_message_preview"] = conv.last_message_preview
+            is_me = conv.last_message_sender_id == current_user.id
+            item["last_message_status"] = message_status(conv.last_seq, is_me, my_read_seq, others_read_seq)
+            item["last_message_is_me"] = is_me
+        if other_user_id:
+            item["name"] = other_name or other_email.split('@')[0]
+            item["other_user_id"] = other_user_id
         inbox_items.append(item)
-        
+
     return inbox_items
 
 
@@ -187,38 +376,69 @@ async def get_inbox(
 async def get_messages(
     conversation_id: str,
     limit: int = 50,
-    offset: int = 0,
+    before_seq: Optional[int] = None,
+    after_seq: Optional[int] = None,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get message history with likes and replies."""
+    """
+    Get message history with likes and replies, oldest first.
+    Without cursors: the latest `limit` messages. `before_seq`: the page of history before that
+    message. `after_seq`: messages newer than that one, for catching up after a reconnect.
+    Both are (conversation_id, seq) index range scans.
+    """
     try:
         conv_uuid = uuid.UUID(conversation_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    membership_check = select(ConversationParticipant).where(
-        ConversationParticipant.conversation_id == conv_uuid,
-        ConversationParticipant.user_id == current_user.id
+    # Membership check, read watermarks and the clear point in one query. The others' watermark
+    # (read receipts) is DM-only, so a room's history read touches one participant row, not all
+    Other = aliased(ConversationParticipant)
+    others_read = (
+        select(func.min(Other.last_read_seq))
+        .where(Other.conversation_id == conv_uuid, Other.user_id != current_user.id)
+        .scalar_subquery()
+    )
+    watermarks = (
+        select(
+            ConversationParticipant.last_read_seq,
+            case((Conversation.type == ConversationType.DIRECT, others_read)),
+            Conversation.cleared_seq
+        )
+        .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+        .where(
+            ConversationParticipant.conversation_id == conv_uuid,
+            ConversationParticipant.user_id == current_user.id,
+            not_deleted
+        )
     )
-    if not (await session.execute(membership_check)).scalar_one_or_none():
+    row = (await session.execute(watermarks)).first()
+    if row is None:
         raise HTTPException(status_code=403, detail="Not a participant")
+    my_read_seq, others_read_seq, cleared_seq = row
 
-    # Fetch messages + sender info
-    # We also need likes count and if current user liked it
-    # AND reply_to info... this is getting heavy for a single query.
-    # For now, let's keep it simple and maybe do n+1 for likes or use subqueries if needed.
-    
+    if before_seq is not None and after_seq is not None:
+        raise HTTPException(status_code=400, detail="Use either before_seq or after_seq, not both")
+    limit = clamp_limit(limit)
+
+    # Fetch messages + sender info; likes and reply previews are batched below
     query = (
         select(Message, User.email, User.name)
         .join(User, Message.sender_id == User.id)
-        .where(Message.conversation_id == conv_uuid)
-        .order_by(Message.timestamp.desc())
+        .where(Message.conversation_id == conv_uuid, Message.seq > cleared_seq)
         .limit(limit)
-        .offset(offset)
     )
+    if after_seq is not None:
+        query = query.where(Message.seq > after_seq).order_by(Message.seq)
+    else:
+        if before_seq is not None:
+            query = query.where(Message.seq < before_seq)
+        query = query.order_by(Message.seq.desc())
     
     results = (await session.execute(query)).all()
+    if after_seq is None:
+        results = results[::-1]
     
     # Collect message IDs to batch fetch likes and replies
     message_ids = [r[0].id for r in results]
@@ -243,7 +463,7 @@ async def get_messages(
     reply_ids = [r[0].reply_to_id for r in results if r[0].reply_to_id]
     reply_map = {}
     if reply_ids:
-        reply_content_query = select(Message.id, Message.content, User.name).join(User, Message.sender_id == User.id).where(Message.id.in_(reply_ids))
+        reply_content_query = select(Message.id, Message.content, User.name).join(User, Message.sender_id == User.id).where(Message.id.in_(reply_ids), Message.seq > cleared_seq)
         reply_rows = (await session.execute(reply_content_query)).all()
         for rid, rcontent, rname in reply_rows:
             reply_map[rid] = {"content": rcontent, "sender_name": rname}
@@ -262,6 +482,7 @@ async def get_messages(
 
         messages.append({
             "id": msg.id,
+            "seq": msg.seq,
             "content": msg.content,
             "timestamp": msg.timestamp,
             "is_edited": msg.is_edited,
@@ -271,10 +492,10 @@ async def get_messages(
             "likes_count": likes_counts.get(msg.id, 0),
             "is_liked": msg.id in my_likes,
             "reply_to": reply_info,
-            "status": msg.status or "sent"
+            "status": message_status(msg.seq, msg.sender_id == current_user.id, my_read_seq, others_read_seq)
         })
         
-    return messages[::-1]
+    return messages
 
 
 @router.post("/conversations/{conversation_id}/messages")
@@ -290,13 +511,7 @@ async def send_message(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    part_query = select(ConversationParticipant).where(
-        ConversationParticipant.conversation_id == conv_uuid,
-        ConversationParticipant.user_id == current_user.id
-    )
-    participant = (await session.execute(part_query)).scalar_one_or_none()
-    
-    if not participant:
+    if not await membership.is_member(session, conv_uuid, current_user.id):
         raise HTTPException(status_code=403, detail="Not a participant")
 
     reply_uuid = None
@@ -312,23 +527,60 @@ async def send_message(
         content=payload.content,
         reply_to_id=reply_uuid
     )
+
+    # Take the next sequence number under the conversation row lock, updating the inbox
+    # denormalization in the same statement; commits together with the message.
+    # not_deleted backs up the cached membership check if a delete event was missed
+    new_msg.seq = (await session.execute(
+        update(Conversation)
+        .where(Conversation.id == conv_uuid, not_deleted)
+        .values(
+            last_seq=Conversation.last_seq + 1,
+            updated_at=func.now(),
+            last_message_id=new_msg.id,
+            last_message_preview=message_preview(new_msg.content),
+            last_message_sender_id=current_user.id,
+            last_message_at=new_msg.timestamp
+        )
+        .returning(Conversation.last_seq)
+    )).scalar_one_or_none()
+    if new_msg.seq is None:
+        await session.rollback()
+        membership.invalidate(conv_uuid)
+        raise HTTPException(status_code=403, detail="Not a participant")
     session.add(new_msg)
-    
-    conv = await session.get(Conversation, conv_uuid)
-    if conv:
-        conv.updated_at = func.now()
-        session.add(conv)
+
+    # Sending implies having read the conversation up to your own message
+    await session.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.conversation_id == conv_uuid, ConversationParticipant.user_id == current_user.id)
+        .values(last_read_seq=new_msg.seq, last_read_at=new_msg.timestamp)
+    )
         
     await session.commit()
     await session.refresh(new_msg)
     
-    # Real-time sync now handled by Firebase Firestore on the client side
+    bus.emit(
+        MESSAGE_SENT,
+        type="message.created",
+        conversation_id=conv_uuid,
+        message={
+            "id": str(new_msg.id),
+            "seq": new_msg.seq,
+            "content": new_msg.content,
+            "timestamp": new_msg.timestamp.isoformat(),
+            "sender_id": str(current_user.id),
+            "sender_name": current_user.name or current_user.email.split('@')[0],
+            "reply_to_id": str(reply_uuid) if reply_uuid else None
+        }
+    )
     
     return {
         "id": str(new_msg.id),
         "content": new_msg.content,
+        "seq": new_msg.seq,
         "timestamp": new_msg.timestamp.isoformat(),
-        "status": new_msg.status
+        "status": "sent"
     }
 
 @router.post("/messages/{message_id}/like")
@@ -349,11 +601,7 @@ async def like_message(
         raise HTTPException(status_code=404, detail="Message not found")
         
     # Verify participation
-    membership = select(ConversationParticipant).where(
-        ConversationParticipant.conversation_id == msg.conversation_id,
-        ConversationParticipant.user_id == current_user.id
-    )
-    if not (await session.execute(membership)).scalar_one_or_none():
+    if not await membership.is_member(session, msg.conversation_id, current_user.id):
          raise HTTPException(status_code=403, detail="Access denied")
 
     # Check existing like
@@ -374,6 +622,15 @@ async def like_message(
         liked = True
         
     await session.commit()
+
+    bus.emit(
+        CONVERSATION_EVENT,
+        type="message.liked",
+        conversation_id=msg.conversation_id,
+        message_id=msg_uuid,
+        user_id=current_user.id,
+        liked=liked
+    )
     
     return {"status": "toggled", "liked": liked}
 
@@ -385,38 +642,54 @@ async def mark_messages_read(
     current_user: User = Depends(get_current_user)
 ):
     """Mark all messages from other users as read."""
-    from datetime import datetime
-    
     try:
         conv_uuid = uuid.UUID(conversation_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid conversation ID")
     
-    # Verify participation
-    membership = await session.execute(
-        select(ConversationParticipant).where(
+    # Move the watermark to the conversation's last message: one row, regardless of backlog size.
+    # Membership is implied by the participant row being found.
+    previous = (
+        select(ConversationParticipant.id, ConversationParticipant.last_read_seq.label("seq"), Conversation.type)
+        .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+        .where(
             ConversationParticipant.conversation_id == conv_uuid,
-            ConversationParticipant.user_id == current_user.id
+            ConversationParticipant.user_id == current_user.id,
+            not_deleted
         )
+        .with_for_update(of=ConversationParticipant)
+        .subquery()
     )
-    if not membership.scalar_one_or_none():
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    # Update all unread messages from OTHER users to 'read'
-    from sqlalchemy import update
+    last_seq = select(Conversation.last_seq).where(Conversation.id == conv_uuid).scalar_subquery()
     stmt = (
-        update(Message)
-        .where(
-            Message.conversation_id == conv_uuid,
-            Message.sender_id != current_user.id,
-            Message.status != 'read'
+        update(ConversationParticipant)
+        .where(ConversationParticipant.id == previous.c.id)
+        .values(last_read_seq=func.greatest(last_seq, previous.c.seq), last_read_at=datetime.utcnow())
+        .returning(
+            ConversationParticipant.last_read_seq,
+            ConversationParticipant.last_read_seq - previous.c.seq,
+            previous.c.type
         )
-        .values(status='read', read_at=datetime.utcnow())
     )
-    result = await session.execute(stmt)
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        await session.rollback()
+        raise HTTPException(status_code=403, detail="Access denied")
+    last_read_seq, updated, conv_type = row
     await session.commit()
+
+    if updated:
+        # In rooms only the reader's other devices need this; broadcasting it would be members^2 traffic
+        bus.emit(
+            CONVERSATION_EVENT,
+            type="read.updated",
+            conversation_id=conv_uuid,
+            user_id=current_user.id,
+            last_read_seq=last_read_seq,
+            private=conv_type != ConversationType.DIRECT
+        )
     
-    return {"updated": result.rowcount}
+    return {"updated": updated}
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
@@ -424,41 +697,30 @@ async def delete_conversation(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete a conversation entirely."""
+    """
+    Delete a conversation entirely. The conversation is hidden at once; messages, likes and
+    participants are purged in chunks by the background purge job.
+    """
     try:
         conv_uuid = uuid.UUID(conversation_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    # Verify participation and ownership/admin status
-    part_query = select(ConversationParticipant).where(
-        ConversationParticipant.conversation_id == conv_uuid,
-        ConversationParticipant.user_id == current_user.id
-    )
-    participant = (await session.execute(part_query)).scalar_one_or_none()
-    
-    if not participant:
+    # Both DM participants are admins; in rooms only admins may delete
+    role = await membership.role(session, conv_uuid, current_user.id)
+    if role is None:
         raise HTTPException(status_code=403, detail="Not a participant")
+    if role != ConversationRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only conversation admins can do this")
 
-    # For now, allow any participant to delete conversation (simple model)
-    # In a more strict model, we might only allow ADMINs.
-    
-    # 1. Delete Message Likes
-    msg_ids_query = select(Message.id).where(Message.conversation_id == conv_uuid)
-    msg_ids = (await session.execute(msg_ids_query)).scalars().all()
-    if msg_ids:
-        await session.execute(delete(MessageLike).where(MessageLike.message_id.in_(msg_ids)))
-
-    # 2. Delete Messages
-    await session.execute(delete(Message).where(Message.conversation_id == conv_uuid))
-
-    # 3. Delete Participants
-    await session.execute(delete(ConversationParticipant).where(ConversationParticipant.conversation_id == conv_uuid))
-
-    # 4. Delete Conversation
-    await session.execute(delete(Conversation).where(Conversation.id == conv_uuid))
-
+    await session.execute(
+        update(Conversation)
+        .where(Conversation.id == conv_uuid, not_deleted)
+        .values(deleted_at=datetime.utcnow())
+    )
     await session.commit()
+
+    bus.emit(CONVERSATION_EVENT, type="conversation.deleted", conversation_id=conv_uuid)
     return {"status": "deleted"}
 
 
@@ -468,33 +730,37 @@ async def clear_conversation(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Clear all messages in a conversation."""
+    """
+    Clear all messages in a conversation. Everything up to the current last_seq is hidden at once
+    and purged in chunks by the background purge job; new messages continue the sequence.
+    """
     try:
         conv_uuid = uuid.UUID(conversation_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    part_query = select(ConversationParticipant).where(
-        ConversationParticipant.conversation_id == conv_uuid,
-        ConversationParticipant.user_id == current_user.id
-    )
-    if not (await session.execute(part_query)).scalar_one_or_none():
+    # Clearing hides history for everyone, so in rooms it is admin-only (DM participants are admins)
+    role = await membership.role(session, conv_uuid, current_user.id)
+    if role is None:
         raise HTTPException(status_code=403, detail="Not a participant")
-
-    # 1. Delete Message Likes
-    msg_ids_query = select(Message.id).where(Message.conversation_id == conv_uuid)
-    msg_ids = (await session.execute(msg_ids_query)).scalars().all()
-    if msg_ids:
-        await session.execute(delete(MessageLike).where(MessageLike.message_id.in_(msg_ids)))
-
-    # 2. Delete Messages
-    await session.execute(delete(Message).where(Message.conversation_id == conv_uuid))
-
-    # Update conversation's updated_at
-    conv = await session.get(Conversation, conv_uuid)
-    if conv:
-        conv.updated_at = func.now()
-        session.add(conv)
-
+    if role != ConversationRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only conversation admins can do this")
+
+    # Move the clear point and reset the inbox denormalization
+    await session.execute(
+        update(Conversation)
+        .where(Conversation.id == conv_uuid)
+        .values(
+            cleared_seq=Conversation.last_seq,
+            updated_at=func.now(),
+            last_message_id=None,
+            last_message_preview=None,
+            last_message_sender_id=None,
+            last_message_at=None
+        )
+    )
+    # No per-participant writes: unread counts start from cleared_seq (see unread_for)
     await session.commit()
+
+    bus.emit(CONVERSATION_EVENT, type="conversation.cleared", conversation_id=conv_uuid)
     return {"status": "cleared"}
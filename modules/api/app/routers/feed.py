@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import exists, and_, tuple_
+from app.core.database import get_session
+from app.core.auth import get_current_user
+from app.core.block_graph import not_blocked
+from app.core.feed import COMMENT
+from app.core.pagination import DEFAULT_PAGE_SIZE, clamp_limit, encode_cursor, decode_cursor, set_next_cursor
+from app.models.generic import User, UserFollow, Activity, FeedItem, Category, Comment
+from typing import Optional
+import uuid
+from datetime import datetime
+
+router = APIRouter()
+
+def pulled_activities(viewer_id: uuid.UUID, limit: int):
+    """
+    Activities that fan-out left in place (actors that were heavily followed when they were
+    handled), read over ix_activities_pull. Whether to pull was settled at fan-out time, so the
+    actor's current follower count plays no part.
+    """
+    return (
+        select(Activity.id, Activity.created_at)
+        .where(
+            Activity.actor_id.in_(select(UserFollow.followed_id).where(UserFollow.follower_id == viewer_id)),
+            ~Activity.pushed,  # matches the ix_activities_pull predicate
+            Activity.fanned_out_at.is_not(None),
+            not_blocked(Activity.actor_id, viewer_id)
+        )
+        .order_by(Activity.created_at.desc(), Activity.id.desc())
+        .limit(limit + 1)
+    )
+
+def merge_page(pushed: list, pulled: list, limit: int):
+    """Newest-first union of both keyset reads, one copy per activity. Returns (page, has_more)."""
+    merged = {row.id: row for row in pushed}
+    for row in pulled:
+        merged.setdefault(row.id, row)
+    page = sorted(merged.values(), key=lambda row: (row.created_at, row.id), reverse=True)
+    return page[:limit], len(page) > limit
+
+@router.get("/feed")
+async def get_feed(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Votes, proposals, signatures and comments of the accounts the caller follows, newest first.
+    Hybrid fan-out: most activity was pushed into the caller's feed_items by app.core.feed, while
+    activity of heavily followed accounts is pulled from activities here. Both are keyset reads on
+    (created_at, id), merged in memory, then hydrated in one query.
+    """
+    limit = clamp_limit(limit)
+    me = current_user.id
+    after = decode_cursor(cursor, datetime, uuid.UUID) if cursor else None
+
+    # Pushed timeline; unfollowed accounts drop out before their items are trimmed
+    still_following = exists().where(UserFollow.follower_id == me, UserFollow.followed_id == FeedItem.actor_id)
+    pushed = (
+        select(FeedItem.activity_id.label("id"), FeedItem.created_at)
+        .where(FeedItem.owner_id == me, still_following, not_blocked(FeedItem.actor_id, me))
+        .order_by(FeedItem.created_at.desc(), FeedItem.activity_id.desc())
+        .limit(limit + 1)
+    )
+    pulled = pulled_activities(me, limit)
+    if after:
+        pushed = pushed.where(tuple_(FeedItem.created_at, FeedItem.activity_id) < tuple_(*after))
+        pulled = pulled.where(tuple_(Activity.created_at, Activity.id) < tuple_(*after))
+
+    page, more = merge_page((await session.execute(pushed)).all(), (await session.execute(pulled)).all(), limit)
+    if more:
+        set_next_cursor(response, encode_cursor(page[-1].created_at, page[-1].id))
+    if not page:
+        return []
+
+    rows = (await session.execute(
+        select(
+            Activity.id, Activity.kind, Activity.created_at, Activity.category_id, Activity.object_id,
+            Category.name.label("category_name"), Comment.content.label("comment_content"),
+            User.id.label("actor_id"), User.name, User.email, User.user_type, User.is_verified_org
+        )
+        .join(User, User.id == Activity.actor_id)
+        .join(Category, Category.id == Activity.category_id)
+        .outerjoin(Comment, and_(Activity.kind == COMMENT, Comment.id == Activity.object_id))
+        .where(Activity.id.in_([row.id for row in page]))
+    )).all()
+    by_id = {row.id: row for row in rows}
+
+    items = []
+    for entry in page:
+        row = by_id.get(entry.id)
+        # Deleted comments leave their activity behind until it expires
+        if not row or (row.kind == COMMENT and row.comment_content is None):
+            continue
+        items.append({
+            "id": str(row.id),
+            "kind": row.kind,
+            "created_at": row.created_at,
+            "actor": {
+                "id": str(row.actor_id),
+                "name": row.name or row.email.split('@')[0],
+                "user_type": row.user_type,
+                "is_verified_org": row.is_verified_org
+            },
+            "category": {"id": str(row.category_id), "name": row.category_name},
+            "comment": {"id": str(row.object_id), "content": row.comment_content} if row.kind == COMMENT else None
+        })
+    return items
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import uuid
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from sqlalchemy.future import select
+from app.core.database import async_session
+from app.core.auth import get_current_user_ws
+from app.core.membership import membership
+from app.core.realtime import pubsub, Subscriber, user_topic, conversation_topic
+from app.models.generic import Conversation, ConversationParticipant
+
+router = APIRouter()
+
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("WS_HEARTBEAT_INTERVAL_SECONDS", "25"))
+AUTH_TIMEOUT_SECONDS = 10
+
+# Close codes (4000-4999 are application-defined)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_TOO_SLOW = 1013
+CLOSE_IDLE = 1001
+
+async def _authenticate(websocket: WebSocket, token: Optional[str]):
+    """Token from ?token= or a first {"type": "auth", "token": ...} frame. Returns (user, conversation ids)."""
+    if not token:
+        try:
+            frame = json.loads(await asyncio.wait_for(websocket.receive_text(), AUTH_TIMEOUT_SECONDS))
+            token = frame.get("token") if frame.get("type") == "auth" else None
+        except (asyncio.TimeoutError, ValueError, AttributeError):
+            token = None
+    if not token:
+        return None, []
+
+    async with async_session() as session:
+        try:
+            user = await get_current_user_ws(token, session)
+        except HTTPException:
+            return None, []
+        conversation_ids = (await session.execute(
+            select(ConversationParticipant.conversation_id)
+            .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+            .where(ConversationParticipant.user_id == user.id, Conversation.deleted_at.is_(None))
+        )).scalars().all()
+    return user, conversation_ids
+
+async def _is_participant(conversation_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    async with async_session() as session:
+        return await membership.is_member(session, conversation_id, user_id)
+
+async def _pump(websocket: WebSocket, subscriber: Subscriber):
+    """
+    Drain the outbox to the socket, with a heartbeat ping every interval regardless of traffic,
+    so clients that answer pings stay within the receive loop's idle limit on busy streams too.
+    """
+    loop = asyncio.get_running_loop()
+    next_ping = loop.time() + HEARTBEAT_INTERVAL_SECONDS
+    try:
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscriber.queue.get(), max(next_ping - loop.time(), 0))
+            except asyncio.TimeoutError:
+                payload = '{"type":"ping"}'
+                next_ping = loop.time() + HEARTBEAT_INTERVAL_SECONDS
+            if payload is None:
+                await websocket.close(code=CLOSE_TOO_SLOW)
+                return
+            await websocket.send_text(payload)
+    except (WebSocketDisconnect, RuntimeError):
+        # Socket went away underneath us; the receive loop cleans up
+        return
+
+async def _handle(frame: dict, subscriber: Subscriber, user_id: uuid.UUID):
+    # Replies go through the outbox too, so the pump stays the socket's only writer
+    kind = frame.get("type")
+    if kind == "ping":
+        subscriber.offer('{"type":"pong"}')
+    elif kind in ("subscribe", "unsubscribe"):
+        try:
+            conversation_id = uuid.UUID(str(frame.get("conversation_id")))
+        except ValueError:
+            subscriber.offer(json.dumps({"type": "error", "detail": "Invalid conversation_id"}))
+            return
+        topic = conversation_topic(conversation_id)
+        if kind == "unsubscribe":
+            pubsub.unsubscribe(topic, subscriber)
+        elif await _is_participant(conversation_id, user_id):
+            pubsub.subscribe(topic, subscriber)
+        else:
+            subscriber.offer(json.dumps({"type": "error", "detail": "Not a participant", "conversation_id": str(conversation_id)}))
+            return
+        subscriber.offer(json.dumps({"type": f"{kind}d", "conversation_id": str(conversation_id)}))
+
+@router.websocket("/ws")
+async def gateway(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Real-time gateway. Authenticates once, then pushes message.created, message.liked,
+    read.updated and conversation.* events for every conversation the user is in.
+    Clients may send {"type": "subscribe"|"unsubscribe", "conversation_id"} to narrow the stream,
+    and must send something (e.g. {"type": "pong"} after a server ping) at least every two
+    heartbeat intervals. After a close, reconnect and catch up with GET .../messages?after_seq=.
+    """
+    await websocket.accept()
+    user, conversation_ids = await _authenticate(websocket, token)
+    if not user:
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
+        return
+
+    subscriber = Subscriber()
+    pubsub.subscribe(user_topic(user.id), subscriber)
+    for conversation_id in conversation_ids:
+        pubsub.subscribe(conversation_topic(conversation_id), subscriber)
+    await websocket.send_text(json.dumps({
+        "type": "ready",
+        "user_id": str(user.id),
+        "conversations": [str(c) for c in conversation_ids],
+        "heartbeat_interval": HEARTBEAT_INTERVAL_SECONDS
+    }))
+
+    pump = asyncio.create_task(_pump(websocket, subscriber))
+    receive = None
+    try:
+        while not pump.done():
+            receive = asyncio.ensure_future(websocket.receive_text())
+            done, _ = await asyncio.wait({receive, pump}, timeout=HEARTBEAT_INTERVAL_SECONDS * 2, return_when=asyncio.FIRST_COMPLETED)
+            if receive not in done:
+                # Either the pump closed a slow consumer or the client went silent
+                if not pump.done():
+                    await websocket.close(code=CLOSE_IDLE)
+                break
+            try:
+                frame = json.loads(receive.result())
+            except ValueError:
+                continue
+            if isinstance(frame, dict):
+                await _handle(frame, subscriber, user.id)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        pubsub.unsubscribe_all(subscriber)
+        pump.cancel()
+        if receive is not None and not receive.done():
+            receive.cancel()
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, update, case, exists, literal, tuple_
+from pydantic import BaseModel
 from app.core.database import get_session
 from app.core.auth import get_current_user, get_optional_current_user
-from app.models.generic import Category, CategoryBase, User, CategoryStatus, CategoryType, CategoryProposalSignature, UserBlock
+from app.core.block_graph import block_graph, not_blocked, blocked_between
+from app.core.cache import TTLCache
+from app.core.events import bus, CATEGORY_CHANGED, emit_category_changed
+from app.core import feed
+from app.core.scoring import decay_position, log2_add_sql
+from app.core.pagination import DEFAULT_PAGE_SIZE, clamp_limit, encode_cursor, decode_cursor, set_next_cursor
+from app.models.generic import Category, CategoryBase, User, UserType, CategoryStatus, CategoryType, CategoryProposalSignature
 from typing import Optional
 import uuid
 from datetime import datetime
@@ -13,6 +21,16 @@ router = APIRouter()
 
 SIGNATURE_THRESHOLD = 50 
 
+# Trending score: log2 of the sum of 2^(signature time / half-life), see app.core.scoring
+TREND_HALF_LIFE_HOURS = 24.0
+
+def trend_position(ts: datetime) -> float:
+    return decay_position(ts, TREND_HALF_LIFE_HOURS)
+
+def trending_score_after_signature(ts: datetime):
+    """SQL expression for trending_score after one more signature at `ts`."""
+    return log2_add_sql(Category.trending_score, trend_position(ts))
+
 @router.post("/proposals", response_model=Category, status_code=status.HTTP_201_CREATED)
 async def propose_category(
     category_in: CategoryBase,
@@ -38,6 +56,7 @@ async def propose_category(
         new_category.status = CategoryStatus.PROPOSAL
         new_category.is_active = False
         new_category.proposal_signatures = 1 
+        new_category.trending_score = trend_position(datetime.utcnow())
         
         first_sig = CategoryProposalSignature(
             user_id=current_user.id,
@@ -46,164 +65,177 @@ async def propose_category(
         session.add(first_sig)
 
     session.add(new_category)
+    feed.record_activity(session, current_user.id, feed.PROPOSAL, new_category.id)
     await session.commit()
     await session.refresh(new_category)
+    emit_category_changed(new_category.id, new_category.status, new_category.start_time, new_category.end_time)
     
     return new_category
 
-@router.get("/proposals")
+class ProposalSummary(BaseModel):
+    id: uuid.UUID
+    name: str
+    description: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    is_active: bool
+    creator_id: Optional[uuid.UUID] = None
+    category_type: str
+    status: str
+    proposal_signatures: int
+    trending_score: float
+    created_at: Optional[datetime] = None
+    creator_name: str
+    creator_type: str
+    creator_verified: bool
+    has_signed: bool
+    comments_disabled: bool
+
+# sort mode -> (keyset column, cursor value type)
+PROPOSAL_SORTS = {
+    "newest": (Category.created_at, datetime),
+    "most_signed": (Category.proposal_signatures, int),
+    "trending": (Category.trending_score, float),
+}
+
+def _proposal_columns(current_user: Optional[User]) -> list:
+    """Columns shaping a proposal row (with creator + has_signed) entirely in SQL."""
+    has_signed = literal(False)
+    if current_user:
+        has_signed = exists().where(
+            CategoryProposalSignature.category_id == Category.id,
+            CategoryProposalSignature.user_id == current_user.id
+        )
+    return [
+        Category.id, Category.name, Category.description, Category.start_time, Category.end_time,
+        Category.is_active, Category.creator_id, Category.category_type, Category.status,
+        Category.proposal_signatures, Category.trending_score, Category.created_at, Category.comments_disabled,
+        func.coalesce(func.split_part(User.email, '@', 1), "System").label("creator_name"),
+        func.coalesce(User.user_type, UserType.INDIVIDUAL).label("creator_type"),
+        func.coalesce(User.is_verified_org, False).label("creator_verified"),
+        has_signed.label("has_signed")
+    ]
+
+@router.get("/proposals", response_model=list[ProposalSummary])
 async def list_proposals(
+    response: Response,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
     session: AsyncSession = Depends(get_session),
     current_user: Optional[User] = Depends(get_optional_current_user)
 ):
-    """List all pending proposals with has_signed context."""
-    try:
-        # 1. Get blocked relationships
-        blocked_user_ids = set()
-        if current_user:
-            # Users current user has blocked
-            block_query = select(UserBlock.blocked_id).where(UserBlock.blocker_id == current_user.id)
-            block_res = await session.execute(block_query)
-            blocked_user_ids.update(block_res.scalars().all())
-            
-            # Users who have blocked current user
-            blocked_by_query = select(UserBlock.blocker_id).where(UserBlock.blocked_id == current_user.id)
-            blocked_by_res = await session.execute(blocked_by_query)
-            blocked_user_ids.update(blocked_by_res.scalars().all())
+    """
+    List pending proposals with has_signed context.
+    Sort by newest, most_signed or trending; next page cursor is returned in the X-Next-Cursor header.
+    """
+    if sort not in PROPOSAL_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort. Use one of: {', '.join(PROPOSAL_SORTS)}")
+    sort_column, cursor_type = PROPOSAL_SORTS[sort]
+    limit = clamp_limit(limit)
 
+    try:
+        # Bounded keyset scan over the (status, sort key, id) index
         query = (
-            select(
-                Category, 
-                User.email.label("creator_name"),
-                User.user_type.label("creator_type"),
-                User.is_verified_org.label("creator_verified")
-            )
+            select(*_proposal_columns(current_user))
             .outerjoin(User, Category.creator_id == User.id)
-            .where(Category.status == 'PROPOSAL')
+            .where(Category.status == CategoryStatus.PROPOSAL)
+            .order_by(sort_column.desc(), Category.id.desc())
+            .limit(limit + 1)
         )
-        
-        if blocked_user_ids:
-            query = query.where(Category.creator_id.notin_(list(blocked_user_ids)))
-
-        result = await session.execute(query)
-        
-        # Check current user's signatures
-        signed_ids = set()
+        if cursor:
+            last_key, last_id = decode_cursor(cursor, cursor_type, uuid.UUID)
+            query = query.where(tuple_(sort_column, Category.id) < tuple_(last_key, last_id))
         if current_user:
-            sig_query = select(CategoryProposalSignature.category_id).where(
-                CategoryProposalSignature.user_id == current_user.id
-            )
-            sig_result = await session.execute(sig_query)
-            signed_ids = set(sig_result.scalars().all())
-
-        proposals = []
-        for row in result.all():
-            cat = row.Category
-            proposals.append({
-                "id": str(cat.id),
-                "name": cat.name,
-                "description": cat.description,
-                "start_time": cat.start_time.isoformat() if cat.start_time else None,
-                "end_time": cat.end_time.isoformat() if cat.end_time else None,
-                "is_active": cat.is_active,
-                "creator_id": str(cat.creator_id) if cat.creator_id else None,
-                "category_type": cat.category_type,
-                "status": cat.status,
-                "proposal_signatures": cat.proposal_signatures,
-                "created_at": cat.created_at.isoformat() if cat.created_at else None,
-                "creator_name": row.creator_name.split('@')[0] if row.creator_name else "System",
-                "creator_type": row.creator_type if row.creator_type else "INDIVIDUAL",
-                "creator_verified": row.creator_verified if row.creator_verified is not None else False,
-                "has_signed": cat.id in signed_ids,
-                "comments_disabled": cat.comments_disabled
-            })
-        return proposals
+            query = query.where(not_blocked(Category.creator_id, current_user.id))
+
+        rows = [dict(row) for row in (await session.execute(query)).mappings().all()]
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            set_next_cursor(response, encode_cursor(last[sort_column.key], last["id"]))
+        return rows
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in list_proposals: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to fetch proposals: {str(e)}")
 
-@router.get("/proposals/{category_id}")
+class Supporter(BaseModel):
+    id: uuid.UUID
+    name: str
+
+class ProposalDetail(ProposalSummary):
+    supporters: list[Supporter]
+
+SUPPORTERS_GRID_SIZE = 12
+
+# Viewer-independent proposal detail (proposal, creator, latest supporters).
+# Invalidated on every worker through the event bus; the TTL covers events lost in transit.
+proposal_cache = TTLCache(maxsize=2000, ttl=30)
+bus.register_cache("proposal_detail", proposal_cache)
+bus.on(CATEGORY_CHANGED, lambda data: proposal_cache.pop(uuid.UUID(data["category_id"])))
+
+async def _load_proposal_detail(session: AsyncSession, category_id: uuid.UUID) -> Optional[dict]:
+    query = (
+        select(*_proposal_columns(None))
+        .outerjoin(User, Category.creator_id == User.id)
+        .where(Category.id == category_id)
+    )
+    row = (await session.execute(query)).mappings().first()
+    if not row:
+        return None
+
+    # Fetch recent supporters (latest 12 for the grid)
+    supporters_query = (
+        select(User.id, func.split_part(User.email, '@', 1).label("name"))
+        .join(CategoryProposalSignature, User.id == CategoryProposalSignature.user_id)
+        .where(CategoryProposalSignature.category_id == category_id)
+        .order_by(CategoryProposalSignature.timestamp.desc())
+        .limit(SUPPORTERS_GRID_SIZE)
+    )
+    supporters = [dict(s) for s in (await session.execute(supporters_query)).mappings().all()]
+    return {**row, "supporters": supporters}
+
+@router.get("/proposals/{category_id}", response_model=ProposalDetail)
 async def get_proposal(
     category_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
     current_user: Optional[User] = Depends(get_optional_current_user)
 ):
-    """Get details for a single proposal including recent supporters."""
+    """
+    Get details for a single proposal including recent supporters.
+    The shared part is cached; viewer flags (signature, blocks) cost one combined query.
+    """
     try:
-        query = (
-            select(
-                Category, 
-                User.email.label("creator_name"),
-                User.user_type.label("creator_type"),
-                User.is_verified_org.label("creator_verified")
-            )
-            .outerjoin(User, Category.creator_id == User.id)
-            .where(Category.id == category_id)
-        )
-        result = await session.execute(query)
-        row = result.first()
-        if not row:
-            raise HTTPException(status_code=404, detail="Proposal not found")
-        
-        cat = row.Category
+        detail = proposal_cache.get(category_id)
+        if detail is None:
+            detail = await _load_proposal_detail(session, category_id)
+            if not detail:
+                raise HTTPException(status_code=404, detail="Proposal not found")
+            proposal_cache.set(category_id, detail)
 
-        # Check for blocks
-        if current_user:
-            block_check = select(UserBlock.id).where(
-                ((UserBlock.blocker_id == current_user.id) & (UserBlock.blocked_id == cat.creator_id)) |
-                ((UserBlock.blocker_id == cat.creator_id) & (UserBlock.blocked_id == current_user.id))
-            )
-            block_res = await session.execute(block_check)
-            if block_res.scalar_one_or_none():
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to view this proposal.")
-        
-        # Check current user signature
         has_signed = False
         if current_user:
-            sig_check = select(CategoryProposalSignature.id).where(
-                CategoryProposalSignature.user_id == current_user.id,
-                CategoryProposalSignature.category_id == category_id
+            creator_id = detail["creator_id"]
+            flags_query = select(
+                exists().where(
+                    CategoryProposalSignature.user_id == current_user.id,
+                    CategoryProposalSignature.category_id == category_id
+                ).label("has_signed"),
+                (blocked_between(creator_id, current_user.id) if creator_id else literal(False)).label("is_blocked")
             )
-            sig_res = await session.execute(sig_check)
-            has_signed = sig_res.scalar_one_or_none() is not None
-
-        # Fetch recent supporters (latest 12 for the grid)
-        supporters_query = (
-            select(User.id, User.email)
-            .join(CategoryProposalSignature, User.id == CategoryProposalSignature.user_id)
-            .where(CategoryProposalSignature.category_id == category_id)
-            .order_by(CategoryProposalSignature.timestamp.desc())
-            .limit(12)
-        )
-        sup_result = await session.execute(supporters_query)
-        supporters = []
-        for s_id, s_email in sup_result.all():
-            supporters.append({
-                "id": str(s_id),
-                "name": s_email.split('@')[0]
-            })
-
-        return {
-            "id": str(cat.id),
-            "name": cat.name,
-            "description": cat.description,
-            "start_time": cat.start_time.isoformat() if cat.start_time else None,
-            "end_time": cat.end_time.isoformat() if cat.end_time else None,
-            "is_active": cat.is_active,
-            "creator_id": str(cat.creator_id) if cat.creator_id else None,
-            "category_type": cat.category_type,
-            "status": cat.status,
-            "proposal_signatures": cat.proposal_signatures,
-            "created_at": cat.created_at.isoformat() if cat.created_at else None,
-            "creator_name": row.creator_name.split('@')[0] if row.creator_name else "System",
-            "creator_type": row.creator_type if row.creator_type else "INDIVIDUAL",
-            "creator_verified": row.creator_verified if row.creator_verified is not None else False,
-            "has_signed": has_signed,
-            "comments_disabled": cat.comments_disabled,
-            "supporters": supporters
-        }
+            flags = (await session.execute(flags_query)).one()
+
+            # Check for blocks
+            if flags.is_blocked:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to view this proposal.")
+            has_signed = flags.has_signed
+
+        return {**detail, "has_signed": has_signed}
     except HTTPException:
         raise
     except Exception as e:
@@ -230,38 +262,50 @@ async def sign_proposal(
         raise HTTPException(status_code=404, detail="Proposal not found or already active.")
 
     # 1b. Check for blocks
-    block_check = select(UserBlock.id).where(
-        ((UserBlock.blocker_id == current_user.id) & (UserBlock.blocked_id == category.creator_id)) |
-        ((UserBlock.blocker_id == category.creator_id) & (UserBlock.blocked_id == current_user.id))
-    )
-    block_res = await session.execute(block_check)
-    if block_res.scalar_one_or_none():
+    if await block_graph.is_blocked(session, current_user.id, category.creator_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Interaction blocked.")
 
-    # 2. Add signature
+    # 2. Add signature and bump the counter in a single transaction
     new_sig = CategoryProposalSignature(user_id=current_user.id, category_id=category_id)
     session.add(new_sig)
     
     try:
-        await session.commit()
+        await session.flush()
     except IntegrityError:
         await session.rollback()
         raise HTTPException(status_code=400, detail="You have already supported this proposal.")
 
-    # 3. Update count and check threshold
-    category.proposal_signatures += 1
-    
-    if category.proposal_signatures >= SIGNATURE_THRESHOLD:
-        category.status = CategoryStatus.ACTIVE
-        category.is_active = True
-        # In a real app, maybe set start_time to now
-        category.start_time = datetime.utcnow()
-    
-    session.add(category)
+    # 3. Atomic increment; threshold activation is decided on the locked row in the same statement,
+    # so concurrent signers can neither lose updates nor activate twice
+    now = datetime.utcnow()
+    new_count = func.coalesce(Category.proposal_signatures, 0) + 1
+    reaches_threshold = new_count >= SIGNATURE_THRESHOLD
+    stmt = (
+        update(Category)
+        .where(Category.id == category_id, Category.status == CategoryStatus.PROPOSAL)
+        .values(
+            proposal_signatures=new_count,
+            trending_score=trending_score_after_signature(now),
+            status=case((reaches_threshold, CategoryStatus.ACTIVE.value), else_=Category.status),
+            is_active=case((reaches_threshold, True), else_=Category.is_active),
+            # In a real app, maybe set start_time to now
+            start_time=case((reaches_threshold, now), else_=Category.start_time),
+            updated_at=now
+        )
+        .returning(Category.proposal_signatures, Category.status, Category.start_time, Category.end_time)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await session.execute(stmt)).first()
+    if not row:
+        # Activated by a concurrent signer between our read and the update
+        await session.rollback()
+        raise HTTPException(status_code=404, detail="Proposal not found or already active.")
+
+    feed.record_activity(session, current_user.id, feed.SIGNATURE, category_id)
     await session.commit()
-    await session.refresh(category)
+    emit_category_changed(category_id, row.status, row.start_time, row.end_time)
     
-    return {"status": category.status, "signatures": category.proposal_signatures}
+    return {"status": row.status, "signatures": row.proposal_signatures}
 
 @router.patch("/proposals/{category_id}/settings", status_code=status.HTTP_200_OK)
 async def toggle_comments(
@@ -283,8 +327,10 @@ async def toggle_comments(
              raise HTTPException(status_code=403, detail="Only the owner can modify these settings")
 
     category.comments_disabled = comments_disabled
+    category.updated_at = datetime.utcnow()
     session.add(category)
     await session.commit()
     await session.refresh(category)
+    bus.invalidate("proposal_detail", category_id)
     
     return {"comments_disabled": category.comments_disabled}
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import delete, exists, literal, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from app.core import counters
 from app.core.database import get_session
-from app.core.auth import get_current_user, resolve_user
-from app.models.generic import User, UserFollow, UserType
+from app.core.events import bus
+from app.core.auth import get_current_user, get_optional_current_user, resolve_user
+from app.core.block_graph import block_graph, not_blocked
+from app.core.pagination import DEFAULT_PAGE_SIZE, clamp_limit, encode_cursor, decode_cursor, set_next_cursor
+from app.models.generic import User, UserFollow
+from typing import Optional
 import uuid
 from datetime import datetime
 
@@ -26,41 +33,25 @@ async def follow_user(
             raise HTTPException(status_code=400, detail="Self-following is not permitted.")
         
         # Check for blocks
-        from app.models.generic import UserBlock
-        block_check = select(UserBlock.id).where(
-            ((UserBlock.blocker_id == current_user.id) & (UserBlock.blocked_id == target_user.id)) |
-            ((UserBlock.blocker_id == target_user.id) & (UserBlock.blocked_id == current_user.id))
-        )
-        block_res = await session.execute(block_check)
-        if block_res.scalar_one_or_none():
+        if await block_graph.is_blocked(session, current_user.id, target_user.id):
             raise HTTPException(status_code=403, detail="Social interaction blocked.")
 
-        # 2. Create Follow Link
-        new_follow = UserFollow(follower_id=current_user.id, followed_id=target_user.id)
-        session.add(new_follow)
-        
-        try:
-            await session.commit()
-            
-            # Ensure count is not None before incrementing
-            if target_user.follower_count is None:
-                target_user.follower_count = 0
-                
-            target_user.follower_count += 1
-            
-            # Check for auto-verification
-            INFLUENCE_THRESHOLD = 10000
-            if target_user.user_type == UserType.ORGANIZATION and not target_user.is_verified_org:
-                if target_user.follower_count >= INFLUENCE_THRESHOLD:
-                    target_user.is_verified_org = True
-
-            session.add(target_user)
-            await session.commit()
-            
-            return {"status": "following", "follower_count": target_user.follower_count}
-        except IntegrityError:
-            await session.rollback()
+        # 2. Create the link and move both counters in one transaction; a duplicate inserts nothing
+        created = (await session.execute(
+            insert(UserFollow)
+            .values(id=uuid.uuid4(), follower_id=current_user.id, followed_id=target_user.id, timestamp=datetime.utcnow())
+            .on_conflict_do_nothing(constraint="one_follow_per_pair")
+            .returning(UserFollow.id)
+        )).scalar_one_or_none()
+        if not created:
             raise HTTPException(status_code=400, detail="You are already following this citizen.")
+
+        follower_count = await counters.add_follower(session, target_user, 1)
+        await counters.add_following(session, current_user.id, 1)
+        await session.commit()
+        bus.invalidate("user_profile", target_user.id, current_user.id)
+
+        return {"status": "following", "follower_count": follower_count}
     except HTTPException:
         raise
     except Exception as e:
@@ -80,45 +71,103 @@ async def unfollow_user(
     if not target_user:
         raise HTTPException(status_code=404, detail="Citizen not found.")
 
-    query = select(UserFollow).where(
-        UserFollow.follower_id == current_user.id,
-        UserFollow.followed_id == target_user.id
-    )
-    result = await session.execute(query)
-    follow_link = result.scalar_one_or_none()
-    
-    if not follow_link:
+    unfollowed = (await session.execute(
+        delete(UserFollow)
+        .where(UserFollow.follower_id == current_user.id, UserFollow.followed_id == target_user.id)
+        .returning(UserFollow.id)
+    )).scalar_one_or_none()
+    if not unfollowed:
         raise HTTPException(status_code=404, detail="No active relationship found.")
-    
-    await session.delete(follow_link)
-    if target_user.follower_count is None:
-        target_user.follower_count = 0
-
-    if target_user.follower_count > 0:
-        target_user.follower_count -= 1
-        session.add(target_user)
-        
+
+    await counters.add_follower(session, target_user, -1)
+    await counters.add_following(session, current_user.id, -1)
     await session.commit()
+    bus.invalidate("user_profile", target_user.id, current_user.id)
     return {"status": "unfollowed"}
 
-@router.get("/users/{user_id}/followers")
-async def get_followers(user_id: str, session: AsyncSession = Depends(get_session)):
-    """List IDs of citizens following this account."""
+def user_card_columns(viewer_id: Optional[uuid.UUID]):
+    """Columns for a user card: display fields plus whether the viewer follows that user."""
+    # Aliased so it never correlates with a user_follows table in the outer query
+    ViewerFollow = aliased(UserFollow)
+    is_following = (
+        exists().where(ViewerFollow.follower_id == viewer_id, ViewerFollow.followed_id == User.id)
+        if viewer_id else literal(False)
+    )
+    return (User.id, User.name, User.email, User.user_type, User.is_verified_org, is_following.label("is_following"))
+
+async def follow_page(
+    response: Response,
+    user_id: str,
+    cursor: Optional[str],
+    limit: int,
+    session: AsyncSession,
+    viewer: Optional[User],
+    followers: bool
+):
+    """
+    One page of a user's followers (or followed accounts), newest follow first, as hydrated cards.
+    Single query: keyset on (timestamp, id) over ix_user_follows_followed_ts / ix_user_follows_follower_ts,
+    with block filtering and the viewer's follow state in SQL.
+    """
     user = await resolve_user(user_id, session)
     if not user:
         raise HTTPException(status_code=404, detail="Citizen not found.")
+    if viewer and await block_graph.has_blocked(session, user.id, viewer.id):
+        raise HTTPException(status_code=403, detail="You do not have permission to view this citizen.")
 
-    query = select(UserFollow.follower_id).where(UserFollow.followed_id == user.id)
-    result = await session.execute(query)
-    return result.scalars().all()
+    limit = clamp_limit(limit)
+    owner, other = (UserFollow.followed_id, UserFollow.follower_id) if followers else (UserFollow.follower_id, UserFollow.followed_id)
+    query = (
+        select(UserFollow.timestamp, UserFollow.id.label("follow_id"), *user_card_columns(viewer.id if viewer else None))
+        .join(User, User.id == other)
+        .where(owner == user.id)
+        .order_by(UserFollow.timestamp.desc(), UserFollow.id.desc())
+        .limit(limit + 1)
+    )
+    if viewer:
+        query = query.where(not_blocked(User.id, viewer.id))
+    if cursor:
+        last_timestamp, last_id = decode_cursor(cursor, datetime, uuid.UUID)
+        query = query.where(tuple_(UserFollow.timestamp, UserFollow.id) < tuple_(last_timestamp, last_id))
+    rows = (await session.execute(query)).all()
 
-@router.get("/users/{user_id}/following")
-async def get_following(user_id: str, session: AsyncSession = Depends(get_session)):
-    """List IDs of citizens this account is following."""
-    user = await resolve_user(user_id, session)
-    if not user:
-        raise HTTPException(status_code=404, detail="Citizen not found.")
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].timestamp, rows[-1].follow_id))
 
-    query = select(UserFollow.followed_id).where(UserFollow.follower_id == user.id)
-    result = await session.execute(query)
-    return result.scalars().all()
+    return [
+        {
+            "id": str(row.id),
+            "name": row.name or row.email.split('@')[0],
+            "user_type": row.user_type,
+            "is_verified_org": row.is_verified_org,
+            "is_following": row.is_following,
+            "is_me": viewer is not None and row.id == viewer.id,
+            "followed_at": row.timestamp
+        }
+        for row in rows
+    ]
+
+@router.get("/users/{user_id}/followers")
+async def get_followers(
+    user_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_current_user)
+):
+    """Citizens following this account, newest first. Next page cursor is in X-Next-Cursor."""
+    return await follow_page(response, user_id, cursor, limit, session, current_user, followers=True)
+
+@router.get("/users/{user_id}/following")
+async def get_following(
+    user_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    session: AsyncSession = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_current_user)
+):
+    """Accounts this citizen follows, newest first. Next page cursor is in X-Next-Cursor."""
+    return await follow_page(response, user_id, cursor, limit, session, current_user, followers=False)
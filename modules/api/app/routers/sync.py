@@ -0,0 +1,189 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import func, or_, and_, cast, literal, literal_column, String
+from sqlalchemy.orm import aliased
+from sqlalchemy.types import UserDefinedType
+from app.core.database import get_session
+from app.core.auth import get_current_user
+from app.core.purge import SYNC_TOMBSTONE_RETENTION
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.generic import (
+    User, Category, Conversation, ConversationParticipant, ConversationType,
+    Message, MessageLike, UserFollow, UserBlock, SyncTombstone
+)
+from typing import Optional
+from datetime import datetime
+
+router = APIRouter()
+
+# Newer history is fetched with GET /conversations/{id}/messages?after_seq=
+SYNC_MESSAGES_PER_CONVERSATION = 100
+# A section larger than this is cheaper to reload wholesale than to diff
+SYNC_MAX_ROWS = 2000
+
+class XID8(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "xid8"
+
+def written_since(table: str, xmin: int):
+    """SQL: rows of `table` inserted or updated by a transaction with id >= xmin (see sync_xid in MIGRATIONS)."""
+    return literal_column(f"{table}.sync_xid") >= cast(literal(str(xmin), String), XID8())
+
+def full_resync(token: str) -> dict:
+    return {"token": token, "full_resync": True}
+
+@router.get("/sync")
+async def sync(
+    since: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delta sync for the mobile store: rows changed since `since`, plus deletions as tombstones.
+    Call without `since` first, then load wholesale and keep the returned token. When
+    `full_resync` is true, reload wholesale again and keep the new token.
+
+    The token is the xmin of a snapshot taken before any data is read. Every transaction below it
+    has finished, so nothing is missed. Rows from transactions still running show up next time;
+    a few rows may come back twice, so clients must upsert by id.
+    """
+    xmin = int((await session.execute(
+        select(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), String))
+    )).scalar_one())
+    now = datetime.utcnow()
+    token = encode_cursor(xmin, now)
+    if since is None:
+        return full_resync(token)
+    since_xmin, issued_at = decode_cursor(since, int, datetime)
+    # Tombstones this old may be pruned already
+    if now - issued_at > SYNC_TOMBSTONE_RETENTION:
+        return full_resync(token)
+
+    me = current_user.id
+    my_conversations = (
+        select(ConversationParticipant.conversation_id)
+        .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+        .where(ConversationParticipant.user_id == me, Conversation.deleted_at.is_(None))
+    )
+
+    # Conversation metadata and my watermark. Deleted conversations are reported until purged,
+    # after which the participant tombstone takes over
+    Other = aliased(ConversationParticipant)
+    conversation_rows = (await session.execute(
+        select(Conversation, ConversationParticipant.last_read_seq, Other.user_id)
+        .join(ConversationParticipant, ConversationParticipant.conversation_id == Conversation.id)
+        .outerjoin(Other, and_(
+            Conversation.type == ConversationType.DIRECT,
+            Other.conversation_id == Conversation.id,
+            Other.user_id != me
+        ))
+        .where(
+            ConversationParticipant.user_id == me,
+            or_(written_since("conversations", since_xmin), written_since("conversation_participants", since_xmin))
+        )
+        .limit(SYNC_MAX_ROWS + 1)
+    )).all()
+
+    # Newest changed messages per conversation; rank N+1 only flags truncation
+    ranked = (
+        select(Message.id, func.row_number().over(partition_by=Message.conversation_id, order_by=Message.seq.desc()).label("rank"))
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(
+            Message.conversation_id.in_(my_conversations),
+            Message.seq > Conversation.cleared_seq,
+            written_since("messages", since_xmin)
+        )
+        .subquery()
+    )
+    message_rows = (await session.execute(
+        select(Message, ranked.c.rank)
+        .join(ranked, ranked.c.id == Message.id)
+        .where(ranked.c.rank <= SYNC_MESSAGES_PER_CONVERSATION + 1)
+        .order_by(Message.conversation_id, Message.seq)
+    )).all()
+
+    likes = (await session.execute(
+        select(MessageLike.id, MessageLike.message_id, MessageLike.user_id, Message.conversation_id)
+        .join(Message, Message.id == MessageLike.message_id)
+        .where(written_since("message_likes", since_xmin), Message.conversation_id.in_(my_conversations))
+        .limit(SYNC_MAX_ROWS + 1)
+    )).all()
+
+    follows = (await session.execute(
+        select(UserFollow.id, UserFollow.followed_id, UserFollow.timestamp)
+        .where(UserFollow.follower_id == me, written_since("user_follows", since_xmin))
+        .limit(SYNC_MAX_ROWS + 1)
+    )).all()
+
+    blocks = (await session.execute(
+        select(UserBlock.id, UserBlock.blocked_id, UserBlock.timestamp)
+        .where(UserBlock.blocker_id == me, written_since("user_blocks", since_xmin))
+        .limit(SYNC_MAX_ROWS + 1)
+    )).all()
+
+    categories = (await session.execute(
+        select(Category).where(written_since("categories", since_xmin)).limit(SYNC_MAX_ROWS + 1)
+    )).scalars().all()
+
+    tombstones = (await session.execute(
+        select(SyncTombstone.kind, SyncTombstone.row_id)
+        .where(
+            written_since("sync_tombstones", since_xmin),
+            or_(SyncTombstone.user_id == me, SyncTombstone.conversation_id.in_(my_conversations))
+        )
+        .limit(SYNC_MAX_ROWS + 1)
+    )).all()
+
+    if any(len(section) > SYNC_MAX_ROWS for section in (conversation_rows, likes, follows, blocks, categories, tombstones)):
+        return full_resync(token)
+
+    truncated = {msg.conversation_id for msg, rank in message_rows if rank > SYNC_MESSAGES_PER_CONVERSATION}
+    conversations = []
+    for conv, last_read_seq, other_user_id in conversation_rows:
+        conversations.append({
+            "id": conv.id,
+            "type": conv.type,
+            "name": conv.name,
+            "other_user_id": other_user_id,
+            "updated_at": conv.updated_at,
+            "last_seq": conv.last_seq,
+            "cleared_seq": conv.cleared_seq,
+            "last_read_seq": last_read_seq,
+            "unread_count": max(conv.last_seq - max(last_read_seq, conv.cleared_seq), 0),
+            "last_message_preview": conv.last_message_preview,
+            "last_message_sender_id": conv.last_message_sender_id,
+            "last_message_at": conv.last_message_at,
+            "deleted": conv.deleted_at is not None,
+            "messages_truncated": conv.id in truncated
+        })
+
+    return {
+        "token": token,
+        "full_resync": False,
+        "conversations": conversations,
+        # Per conversation, only the newest SYNC_MESSAGES_PER_CONVERSATION; older gaps via after_seq
+        "messages": [
+            {
+                "id": msg.id,
+                "conversation_id": msg.conversation_id,
+                "seq": msg.seq,
+                "content": msg.content,
+                "timestamp": msg.timestamp,
+                "is_edited": msg.is_edited,
+                "sender_id": msg.sender_id,
+                "reply_to_id": msg.reply_to_id
+            }
+            for msg, rank in message_rows if rank <= SYNC_MESSAGES_PER_CONVERSATION
+        ],
+        "message_likes": [
+            {"id": like_id, "message_id": message_id, "user_id": user_id, "conversation_id": conversation_id}
+            for like_id, message_id, user_id, conversation_id in likes
+        ],
+        "follows": [{"id": f.id, "followed_id": f.followed_id, "timestamp": f.timestamp} for f in follows],
+        "blocks": [{"id": b.id, "blocked_id": b.blocked_id, "timestamp": b.timestamp} for b in blocks],
+        "categories": categories,
+        "deleted": [{"kind": kind, "id": row_id} for kind, row_id in tombstones]
+    }
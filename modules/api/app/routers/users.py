@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, or_, exists
+from app.core import counters
 from app.core.database import get_session
 from app.core.auth import get_current_user, resolve_user, get_optional_current_user
-from app.models.generic import User, UserBase, UserBlock
+from app.core.block_graph import block_graph, not_blocked
+from app.core.cache import TTLCache
+from app.core.events import bus, VOTE_CAST
+from app.core.pagination import clamp_limit
+from app.core.user_index import user_index, display_name
+from app.models.generic import User, UserBase, UserFollow, UserBlock, Vote
 from typing import Optional
+from datetime import datetime
 import uuid
 
 router = APIRouter()
@@ -18,11 +25,10 @@ async def get_me(
     """Return the current authenticated user with full metadata. Implements Auto-Verification logic."""
     from app.models.generic import UserType
     
-    # REACH-BASED AUTO-VERIFICATION
-    IFLUENCE_THRESHOLD = 10000
+    # REACH-BASED AUTO-VERIFICATION (normally applied by the follow counter update itself)
     if (current_user.user_type == UserType.ORGANIZATION and 
         not current_user.is_verified_org and 
-        current_user.follower_count >= IFLUENCE_THRESHOLD):
+        current_user.follower_count >= counters.INFLUENCE_THRESHOLD):
         
         current_user.is_verified_org = True
         session.add(current_user)
@@ -39,12 +45,17 @@ async def update_me(
     current_user: User = Depends(get_current_user)
 ):
     """Update profile."""
+    old_aliases = [alias for alias in (current_user.email, current_user.auth0_sub) if alias]
     for key, value in user_update.model_dump(exclude_unset=True).items():
         setattr(current_user, key, value)
+    # Watermark for the autocomplete index
+    current_user.updated_at = datetime.utcnow()
     
     session.add(current_user)
     await session.commit()
     await session.refresh(current_user)
+    bus.invalidate("user_profile", current_user.id)
+    bus.invalidate("user_profile_alias", *old_aliases)
     return current_user
 
 @router.get("/users/{user_id}/votes")
@@ -54,7 +65,7 @@ async def get_user_votes(
     current_user: Optional[User] = Depends(get_optional_current_user)
 ):
     """Return all ledger entries (votes) for a specific citizen (by UUID or Auth0 ID)."""
-    from app.models.generic import Vote, Category, Candidate, UserBlock
+    from app.models.generic import Vote, Category, Candidate
     
     user = await resolve_user(user_id, session)
     if not user:
@@ -63,12 +74,7 @@ async def get_user_votes(
     # Check for blocks
     if current_user and current_user.id != user.id:
         # Check if target user blocks current user
-        block_query = select(UserBlock.id).where(
-            UserBlock.blocker_id == user.id,
-            UserBlock.blocked_id == current_user.id
-        )
-        block_res = await session.execute(block_query)
-        if block_res.scalar_one_or_none():
+        if await block_graph.has_blocked(session, user.id, current_user.id):
             raise HTTPException(status_code=403, detail="Access denied.")
 
     query = (
@@ -87,69 +93,105 @@ async def get_user_votes(
     result = await session.execute(query)
     return result.mappings().all()
 
+# Viewer-independent profile (identity, counts). Invalidated on every worker by follows, votes
+# and profile updates through the event bus; the TTL covers events lost in transit and
+# follows of hot accounts, whose counts are merged from shards.
+profile_cache = TTLCache(maxsize=20000, ttl=30)
+# Auth0 sub / email -> user id; both are editable, so update_me invalidates the old aliases
+profile_alias_cache = TTLCache(maxsize=20000, ttl=3600)
+bus.register_cache("user_profile", profile_cache)
+bus.register_cache("user_profile_alias", profile_alias_cache, key_type=str)
+
+def _on_vote_cast(data: dict) -> None:
+    if data.get("user_id"):
+        profile_cache.pop(uuid.UUID(data["user_id"]))
+
+bus.on(VOTE_CAST, _on_vote_cast)
+
+async def _load_profile(session: AsyncSession, user_id_str: str) -> Optional[dict]:
+    """Resolve by UUID, Auth0 sub or email and assemble the shared profile in one query."""
+    try:
+        match = User.id == uuid.UUID(user_id_str)
+    except ValueError:
+        match = or_(User.auth0_sub == user_id_str, User.email == user_id_str)
+    total_votes = select(func.count(Vote.id)).where(Vote.user_id == User.id).correlate(User).scalar_subquery()
+    query = (
+        select(
+            User.id, User.name, User.email, User.user_type, User.is_verified_org, User.following_count,
+            counters.follower_count_sql().label("follower_count"),
+            total_votes.label("total_votes")
+        )
+        .where(match)
+        # resolve_user order: an Auth0 sub match wins over an email match
+        .order_by((User.auth0_sub == user_id_str).desc().nulls_last())
+        .limit(1)
+    )
+    row = (await session.execute(query)).first()
+    if not row:
+        return None
+    return {
+        "id": str(row.id),
+        "name": display_name(row.name, row.email),
+        "user_type": row.user_type,
+        "is_verified_org": row.is_verified_org,
+        "follower_count": row.follower_count,
+        "following_count": row.following_count or 0,
+        "total_votes": row.total_votes
+    }
+
 @router.get("/users/{user_id}/profile")
 async def get_user_profile(
     user_id: str,
     session: AsyncSession = Depends(get_session),
     current_user: Optional[User] = Depends(get_optional_current_user)
 ):
-    """Return a public profile for any citizen with follow context."""
-    user = await resolve_user(user_id, session)
-    if not user:
-        raise HTTPException(status_code=404, detail="Citizen not found")
-
-    # Count following
-    from app.models.generic import UserFollow, Vote
-    following_query = select(func.count(UserFollow.id)).where(UserFollow.follower_id == user.id)
-    following_res = await session.execute(following_query)
-    following_count = following_res.scalar()
+    """
+    Return a public profile for any citizen with follow context.
+    The shared part is cached; viewer flags (follow, blocks) cost one combined query.
+    """
+    try:
+        profile_id = uuid.UUID(user_id)
+    except ValueError:
+        profile_id = profile_alias_cache.get(user_id)
+    profile = profile_cache.get(profile_id) if profile_id else None
+    if profile is None:
+        profile = await _load_profile(session, user_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Citizen not found")
+        profile_id = uuid.UUID(profile["id"])
+        profile_cache.set(profile_id, profile)
+        if str(profile_id) != user_id:
+            profile_alias_cache.set(user_id, profile_id)
 
-    # Total votes cast
-    votes_query = select(func.count(Vote.id)).where(Vote.user_id == user.id)
-    votes_res = await session.execute(votes_query)
-    total_votes = votes_res.scalar()
-
-    # Check if current user is following this profile
     is_following = False
     is_blocked = False
-    if current_user:
-        if current_user.id != user.id:
-            # 1. Check Follow
-            follow_query = select(UserFollow.id).where(
-                UserFollow.follower_id == current_user.id,
-                UserFollow.followed_id == user.id
-            )
-            follow_res = await session.execute(follow_query)
-            is_following = follow_res.scalar_one_or_none() is not None
-
-            # 2. Check Blocked by Me
-            block_query = select(UserBlock.id).where(
-                UserBlock.blocker_id == current_user.id,
-                UserBlock.blocked_id == user.id
+    if current_user and current_user.id != profile_id:
+        flags = (await session.execute(
+            select(
+                exists().where(
+                    UserFollow.follower_id == current_user.id,
+                    UserFollow.followed_id == profile_id
+                ).label("is_following"),
+                exists().where(
+                    UserBlock.blocker_id == current_user.id,
+                    UserBlock.blocked_id == profile_id
+                ).label("is_blocked"),
+                exists().where(
+                    UserBlock.blocker_id == profile_id,
+                    UserBlock.blocked_id == current_user.id
+                ).label("blocked_me")
             )
-            block_res = await session.execute(block_query)
-            is_blocked = block_res.scalar_one_or_none() is not None
-
-            # 3. Check Blocked Me
-            blocked_me_query = select(UserBlock.id).where(
-                UserBlock.blocker_id == user.id,
-                UserBlock.blocked_id == current_user.id
-            )
-            blocked_me_res = await session.execute(blocked_me_query)
-            if blocked_me_res.scalar_one_or_none():
-                raise HTTPException(status_code=403, detail="You do not have permission to view this citizen.")
+        )).one()
+        if flags.blocked_me:
+            raise HTTPException(status_code=403, detail="You do not have permission to view this citizen.")
+        is_following = flags.is_following
+        is_blocked = flags.is_blocked
 
     return {
-        "id": str(user.id),
-        "name": user.email.split('@')[0], # Display name placeholder
-        "user_type": user.user_type,
-        "is_verified_org": user.is_verified_org,
-        "follower_count": user.follower_count or 0,
-        "following_count": following_count or 0,
-        "total_votes": total_votes or 0,
+        **profile,
         "is_following": is_following,
         "is_blocked": is_blocked,
-        "is_me": current_user.id == user.id if current_user else False
+        "is_me": current_user.id == profile_id if current_user else False
     }
 
 
@@ -157,45 +199,52 @@ async def get_user_profile(
 async def search_users(
     q: str,
     limit: int = 10,
+    prefix: bool = False,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Search for users by name or email to start a DM."""
+    """
+    Search for users by name or email to start a DM.
+    Default: substring and fuzzy matches ranked by trigram similarity (pg_trgm GIN indexes).
+    `prefix=true`: display-name autocomplete from the in-memory prefix index, no database round trip.
+    """
+    q = q.strip()
     if not q or len(q) < 2:
         return []
-    
-    # Search by name or email (case-insensitive)
-    search_pattern = f"%{q}%"
-    query = select(User).where(
-        (User.name.ilike(search_pattern)) | (User.email.ilike(search_pattern))
-    ).where(
-        User.id != current_user.id  # Exclude self
-    ).limit(limit)
-    
-    results = (await session.execute(query)).scalars().all()
-    
-    # Filter out blocked users
-    if results:
-        user_ids = [u.id for u in results]
-        block_query = select(UserBlock.blocked_id).where(
-            UserBlock.blocker_id == current_user.id,
-            UserBlock.blocked_id.in_(user_ids)
+    limit = clamp_limit(limit)
+
+    if prefix and user_index.loaded:
+        exclude = {str(current_user.id)} | {str(u) for u in await block_graph.blocked_set(session, current_user.id)}
+        return user_index.search(q, limit, exclude)
+
+    if prefix:
+        # Index still warming up: prefix match in SQL
+        match = or_(User.name.istartswith(q, autoescape=True), User.email.istartswith(q, autoescape=True))
+        score = func.similarity(func.coalesce(User.name, User.email), q)
+    else:
+        match = or_(
+            User.name.icontains(q, autoescape=True),
+            User.email.icontains(q, autoescape=True),
+            User.name.op("%")(q),
+            User.email.op("%")(q)
         )
-        blocked_ids = set((await session.execute(block_query)).scalars().all())
-        
-        # Also filter users who blocked me
-        blocked_me_query = select(UserBlock.blocker_id).where(
-            UserBlock.blocked_id == current_user.id,
-            UserBlock.blocker_id.in_(user_ids)
+        score = func.greatest(func.similarity(func.coalesce(User.name, ""), q), func.similarity(User.email, q))
+    query = (
+        select(User.id, User.name, User.email, User.user_type, User.is_verified_org)
+        .where(
+            match,
+            User.id != current_user.id,  # Exclude self
+            not_blocked(User.id, current_user.id)  # Exclude blocks in either direction
         )
-        blocked_me_ids = set((await session.execute(blocked_me_query)).scalars().all())
-        
-        results = [u for u in results if u.id not in blocked_ids and u.id not in blocked_me_ids]
+        .order_by(score.desc(), User.id)
+        .limit(limit)
+    )
+    results = (await session.execute(query)).all()
     
     return [
         {
             "id": str(u.id),
-            "name": u.name or u.email.split('@')[0],
+            "name": display_name(u.name, u.email),
             "email": u.email,
             "user_type": u.user_type,
             "is_verified_org": u.is_verified_org
@@ -4,7 +4,11 @@ from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from app.core.database import get_session
 from app.core.auth import get_current_user
-from app.models.generic import Vote, VoteBase, User, AuditLog
+from app.core.rollups import record_vote
+from app.core.registry import registry
+from app.core.events import bus, VOTE_CAST
+from app.core import feed
+from app.models.generic import Vote, VoteBase, User, AuditLog, Category, CategoryStatus, CategoryResult
 
 router = APIRouter()
 
@@ -31,6 +35,11 @@ async def cast_vote(
 
     # Force the user_id from the authenticated token
     vote_in.user_id = current_user.id
+
+    # Ballot validation (category, candidate membership, voting window) from the in-process registry
+    if not registry.knows(vote_in.category_id, vote_in.candidate_id):
+        await registry.reload_category(session, vote_in.category_id, vote_in.candidate_id)
+    registry.validate_ballot(vote_in.category_id, vote_in.candidate_id)
     
     # 1. Idempotency Check
     query = select(Vote).where(Vote.idempotency_key == vote_in.idempotency_key)
@@ -66,9 +75,16 @@ async def cast_vote(
             })
         )
         session.add(audit_entry)
+
+        # 5. Feed the per-minute trend rollup in the same transaction
+        await record_vote(session, new_vote)
+
+        # 6. Followers see that a vote was cast in the category, never for whom
+        feed.record_activity(session, current_user.id, feed.VOTE, new_vote.category_id)
         
         await session.commit()
         await session.refresh(new_vote)
+        bus.emit(VOTE_CAST, category_id=new_vote.category_id, candidate_id=new_vote.candidate_id, user_id=new_vote.user_id)
         return new_vote
         
     except IntegrityError as e:
@@ -109,13 +125,27 @@ async def get_summary(session: AsyncSession = Depends(get_session)):
     # In real app, use func.count()
     from sqlalchemy import func
     
-    total_votes_query = select(func.count(Vote.id))
-    total_votes = await session.execute(total_votes_query)
+    # Frozen categories contribute their snapshot totals; every other ledger (including categories
+    # archived before snapshots existed) is counted live, like the leaderboard's fallback when
+    # lifecycle.get_frozen_results has no rows
+    from sqlalchemy import exists
+    frozen = exists().where(CategoryResult.category_id == Vote.category_id)
+    live_votes_query = select(func.count(Vote.id)).where(~frozen)
+    live_votes = (await session.execute(live_votes_query)).scalar() or 0
+
+    frozen_votes_query = select(func.coalesce(func.sum(CategoryResult.votes), 0))
+    frozen_votes = (await session.execute(frozen_votes_query)).scalar() or 0
+
+    open_elections_query = select(func.count(Category.id)).where(
+        Category.status == CategoryStatus.ACTIVE,
+        Category.is_active == True
+    )
+    open_elections = (await session.execute(open_elections_query)).scalar() or 0
     
     # Mocking some other stats for now
     return {
-        "total_votes": total_votes.scalar(),
+        "total_votes": live_votes + frozen_votes,
         "active_users": 12402,
-        "open_elections": 8,
+        "open_elections": open_elections,
         "revenue": "$12,450"
     }
@@ -0,0 +1,132 @@
+"""
+Benchmark for comment full-text search.
+
+Generates a synthetic corpus of N comments (server-side, via generate_series) on one bench
+proposal, then times the search_comments handler for a set of queries, first page and
+a cursor page, with and without the proposal filter. Prints EXPLAIN ANALYZE for the
+ranking query so the GIN index usage can be checked.
+
+Usage: python bench_comment_search.py [comments] [--keep]
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+from fastapi import Response
+from sqlalchemy import text, delete
+from app.core.database import async_session, init_db
+from app.models.generic import User, Category, Comment, CategoryStatus
+from app.routers import comments
+
+WORDS = [
+    "vote", "pizza", "election", "budget", "park", "music", "transit", "school", "coffee", "river",
+    "bike", "library", "festival", "housing", "garden", "market", "stadium", "bridge", "museum", "tax",
+    "concert", "beach", "train", "hospital", "bakery", "cinema", "harbor", "forest", "theater", "mayor",
+]
+QUERIES = ["pizza", "park bike", "\"music festival\"", "transit -train", "library OR museum", "zzzunmatched"]
+USER_POOL = 200
+BATCH = 100_000
+
+async def seed(count: int, run_tag: str):
+    async with async_session() as session:
+        creator = User(email=f"bench-creator-{run_tag}@votestar.test", device_fingerprint="bench")
+        authors = [
+            User(email=f"bench-{run_tag}-{i}@votestar.test", device_fingerprint="bench")
+            for i in range(USER_POOL)
+        ]
+        session.add(creator)
+        session.add_all(authors)
+        category = Category(
+            name=f"Bench search {run_tag}",
+            start_time=datetime.utcnow(),
+            end_time=datetime.utcnow() + timedelta(days=7),
+            creator_id=creator.id,
+            category_type="COMMUNITY",
+            status=CategoryStatus.PROPOSAL,
+            is_active=False
+        )
+        session.add(category)
+        await session.commit()
+        viewer, category_id = creator, category.id
+        author_ids = [str(user.id) for user in authors]
+
+    # Random 8-20 word comments from WORDS, authored by the bench user pool
+    insert_batch = text("""
+        INSERT INTO comments (id, user_id, category_id, content, timestamp, like_count, hot_score)
+        SELECT gen_random_uuid(),
+               (CAST(:author_ids AS uuid[]))[1 + n % :pool],
+               :category_id,
+               (SELECT string_agg((CAST(:words AS text[]))[1 + floor(random() * :word_count)::int], ' ')
+                  FROM generate_series(1, 8 + (n % 13)) AS w),
+               now() - (n || ' seconds')::interval,
+               0, 0
+        FROM generate_series(1, :batch) AS n
+    """)
+    started = time.perf_counter()
+    done = 0
+    while done < count:
+        batch = min(BATCH, count - done)
+        async with async_session() as session:
+            await session.execute(insert_batch, {
+                "author_ids": author_ids, "pool": USER_POOL, "category_id": category_id,
+                "words": WORDS, "word_count": len(WORDS), "batch": batch
+            })
+            await session.commit()
+        done += batch
+        print(f"Seeded {done}/{count} comments")
+    async with async_session() as session:
+        await session.execute(text("ANALYZE comments"))
+        await session.commit()
+    print(f"Corpus ready in {time.perf_counter() - started:.1f}s")
+    return viewer, category_id
+
+async def timed_search(viewer, q, proposal_id=None, cursor=None):
+    async with async_session() as session:
+        response = Response()
+        started = time.perf_counter()
+        rows = await comments.search_comments(
+            response, q=q, proposal_id=proposal_id, cursor=cursor, limit=20,
+            session=session, current_user=viewer
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        return rows, response.headers.get("X-Next-Cursor"), elapsed
+
+async def run(count: int, keep: bool):
+    await init_db()
+    run_tag = uuid.uuid4().hex[:8]
+    viewer, category_id = await seed(count, run_tag)
+
+    try:
+        for q in QUERIES:
+            for scope in (None, category_id):
+                rows, next_cursor, first_ms = await timed_search(viewer, q, scope)
+                line = f"{q!r:24} {'proposal' if scope else 'global':8} page1 {first_ms:7.1f}ms ({len(rows)} rows)"
+                if next_cursor:
+                    rows, _, next_ms = await timed_search(viewer, q, scope, next_cursor)
+                    line += f"  page2 {next_ms:7.1f}ms ({len(rows)} rows)"
+                print(line)
+
+        async with async_session() as session:
+            plan = await session.execute(text("""
+                EXPLAIN (ANALYZE, BUFFERS)
+                SELECT id, ts_rank_cd(search_vector, websearch_to_tsquery('english', 'pizza')) AS rank
+                FROM comments WHERE search_vector @@ websearch_to_tsquery('english', 'pizza')
+                ORDER BY rank DESC, id DESC LIMIT 21
+            """))
+            print("\n".join(row[0] for row in plan))
+    finally:
+        if not keep:
+            async with async_session() as session:
+                await session.execute(delete(Comment).where(Comment.category_id == category_id))
+                await session.execute(delete(Category).where(Category.id == category_id))
+                await session.execute(delete(User).where(User.email.like(f"bench-%{run_tag}%")))
+                await session.commit()
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    count = int(args[0]) if args else 2_000_000
+    asyncio.run(run(count, "--keep" in sys.argv))
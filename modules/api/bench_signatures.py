@@ -0,0 +1,109 @@
+"""
+Concurrency load test for proposal signing.
+
+Creates one proposal and N fresh individual users, then fires every signature at once
+through the real sign_proposal handler, each on its own DB session.
+Passes when the stored counter equals the number of signature rows (zero drift)
+and activation happened exactly once.
+
+Usage: python bench_signatures.py [signers] [threshold]
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+from fastapi import HTTPException
+from sqlalchemy import func, delete
+from sqlalchemy.future import select
+from app.core.database import async_session, init_db
+from app.models.generic import User, Category, CategoryProposalSignature, CategoryStatus, Activity, FeedItem
+from app.routers import proposals
+
+async def sign(category_id, user):
+    async with async_session() as session:
+        try:
+            await proposals.sign_proposal(category_id, session=session, current_user=user)
+            return "signed"
+        except HTTPException as e:
+            return f"http_{e.status_code}"
+
+async def run(signers: int, threshold: int):
+    await init_db()
+    proposals.SIGNATURE_THRESHOLD = threshold
+    run_tag = uuid.uuid4().hex[:8]
+
+    async with async_session() as session:
+        creator = User(email=f"bench-creator-{run_tag}@votestar.test", device_fingerprint="bench")
+        users = [
+            User(email=f"bench-{run_tag}-{i}@votestar.test", device_fingerprint="bench")
+            for i in range(signers)
+        ]
+        session.add(creator)
+        session.add_all(users)
+        await session.flush()
+
+        category = Category(
+            name=f"Bench proposal {run_tag}",
+            start_time=datetime.utcnow(),
+            end_time=datetime.utcnow() + timedelta(days=7),
+            creator_id=creator.id,
+            category_type="COMMUNITY",
+            status=CategoryStatus.PROPOSAL,
+            is_active=False,
+            proposal_signatures=1
+        )
+        session.add(category)
+        await session.flush()
+        session.add(CategoryProposalSignature(user_id=creator.id, category_id=category.id))
+        await session.commit()
+        category_id = category.id
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(sign(category_id, user) for user in users))
+    elapsed = time.perf_counter() - started
+
+    async with async_session() as session:
+        category = await session.get(Category, category_id)
+        rows = (await session.execute(
+            select(func.count(CategoryProposalSignature.id)).where(CategoryProposalSignature.category_id == category_id)
+        )).scalar()
+
+        tally = {}
+        for outcome in outcomes:
+            tally[outcome] = tally.get(outcome, 0) + 1
+
+        print(f"Signers: {signers}  threshold: {threshold}  wall time: {elapsed:.2f}s")
+        print(f"Outcomes: {tally}")
+        print(f"Counter: {category.proposal_signatures}  signature rows: {rows}  status: {category.status}")
+
+        drift = category.proposal_signatures - rows
+        expected_rows = min(threshold, signers + 1)
+        expected_status = CategoryStatus.ACTIVE if rows >= threshold else CategoryStatus.PROPOSAL
+        ok = (
+            drift == 0
+            and rows == 1 + tally.get("signed", 0)
+            and rows == expected_rows
+            and category.status == expected_status
+        )
+        print("RESULT:", "PASS (zero drift)" if ok else f"FAIL (drift {drift})")
+
+        # Clean up bench rows
+        await session.execute(delete(CategoryProposalSignature).where(CategoryProposalSignature.category_id == category_id))
+        bench_activities = select(Activity.id).where(Activity.category_id == category_id)
+        await session.execute(delete(FeedItem).where(FeedItem.activity_id.in_(bench_activities)))
+        await session.execute(delete(Activity).where(Activity.category_id == category_id))
+        await session.execute(delete(Category).where(Category.id == category_id))
+        await session.execute(delete(User).where(User.email.like(f"bench-%{run_tag}%")))
+        await session.commit()
+
+    return ok
+
+if __name__ == "__main__":
+    signers = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else signers + 1
+    ok = asyncio.run(run(signers, threshold))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,143 @@
+"""
+Load test for the /ws gateway.
+
+Seeds one GROUP conversation with N bench users, opens N concurrent sockets against a
+running single-worker server, then posts messages through the REST API and measures how
+long fan-out takes to reach every socket. Tokens are minted locally (the API does not
+verify signatures in dev).
+
+Run the server first, with enough file descriptors on both sides:
+    ulimit -n 65536 && uvicorn app.main:app --workers 1 --port 8000
+
+Usage: python bench_ws.py [connections] [messages] [base_url]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+import httpx
+import websockets
+from jose import jwt
+from sqlalchemy import delete
+from app.core.auth import AUTH0_DOMAIN, API_AUDIENCE
+from app.core.database import async_session, init_db
+from app.models.generic import User, Conversation, ConversationParticipant, ConversationType, Message
+
+CONNECT_CONCURRENCY = 500
+
+def mint_token(sub: str) -> str:
+    claims = {
+        "sub": sub,
+        "aud": API_AUDIENCE,
+        "iss": f"https://{AUTH0_DOMAIN}/",
+        "exp": datetime.utcnow() + timedelta(hours=1)
+    }
+    return jwt.encode(claims, "bench", algorithm="HS256")
+
+async def seed(connections: int, run_tag: str):
+    async with async_session() as session:
+        users = [
+            User(
+                email=f"bench-{run_tag}-{i}@votestar.test",
+                name=f"Bench {i}",
+                auth0_sub=f"bench|{run_tag}-{i}",
+                device_fingerprint="bench"
+            )
+            for i in range(connections + 1)
+        ]
+        conversation = Conversation(type=ConversationType.GROUP, name=f"Bench {run_tag}")
+        session.add_all(users)
+        session.add(conversation)
+        await session.flush()
+        session.add_all(ConversationParticipant(conversation_id=conversation.id, user_id=u.id) for u in users)
+        await session.commit()
+        return conversation.id, [u.auth0_sub for u in users]
+
+class Client:
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.arrivals = {}
+
+    async def run(self, url: str, gate: asyncio.Semaphore, stop: asyncio.Event):
+        async with gate:
+            socket = await websockets.connect(url, max_queue=None, open_timeout=60)
+        try:
+            while not stop.is_set():
+                try:
+                    frame = await asyncio.wait_for(socket.recv(), 1)
+                except asyncio.TimeoutError:
+                    continue
+                received = time.perf_counter()
+                if '"type": "ready"' in frame:
+                    self.ready.set()
+                elif '"type":"ping"' in frame:
+                    await socket.send('{"type":"pong"}')
+                elif '"message.created"' in frame:
+                    # Messages are matched by the marker the sender put in the content
+                    marker = frame.split("bench-marker-", 1)[1].split('"', 1)[0]
+                    self.arrivals[marker] = received
+        finally:
+            await socket.close()
+
+async def run(connections: int, messages: int, base_url: str):
+    await init_db()
+    run_tag = uuid.uuid4().hex[:8]
+    conversation_id, subs = await seed(connections, run_tag)
+    sender_token, listener_subs = mint_token(subs[0]), subs[1:]
+    ws_url = base_url.replace("http", "ws", 1) + "/api/v1/ws?token="
+
+    clients = [Client() for _ in listener_subs]
+    gate, stop = asyncio.Semaphore(CONNECT_CONCURRENCY), asyncio.Event()
+    try:
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(client.run(ws_url + mint_token(sub), gate, stop))
+            for client, sub in zip(clients, listener_subs)
+        ]
+        await asyncio.wait_for(asyncio.gather(*(c.ready.wait() for c in clients)), 600)
+        print(f"Connected {connections} sockets in {time.perf_counter() - started:.1f}s")
+
+        latencies = []
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+            for i in range(messages):
+                marker = f"{run_tag}-{i}"
+                sent = time.perf_counter()
+                response = await http.post(
+                    f"/api/v1/conversations/{conversation_id}/messages",
+                    json={"content": f"bench-marker-{marker}"},
+                    headers={"Authorization": f"Bearer {sender_token}"}
+                )
+                response.raise_for_status()
+                deadline = sent + 30
+                while time.perf_counter() < deadline and not all(marker in c.arrivals for c in clients):
+                    await asyncio.sleep(0.01)
+                arrivals = [c.arrivals[marker] - sent for c in clients if marker in c.arrivals]
+                latencies.append(max(arrivals) if arrivals else float("inf"))
+                print(
+                    f"Message {i}: delivered {len(arrivals)}/{connections}  "
+                    f"p50 {statistics.median(arrivals) * 1000:.0f}ms  last {max(arrivals) * 1000:.0f}ms"
+                    if arrivals else f"Message {i}: delivered 0/{connections}"
+                )
+
+        print(f"Full fan-out: median {statistics.median(latencies) * 1000:.0f}ms  worst {max(latencies) * 1000:.0f}ms")
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        stop.set()
+        async with async_session() as session:
+            await session.execute(delete(Message).where(Message.conversation_id == conversation_id))
+            await session.execute(delete(ConversationParticipant).where(ConversationParticipant.conversation_id == conversation_id))
+            await session.execute(delete(Conversation).where(Conversation.id == conversation_id))
+            await session.execute(delete(User).where(User.email.like(f"bench-{run_tag}-%")))
+            await session.commit()
+
+if __name__ == "__main__":
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    base_url = sys.argv[3] if len(sys.argv) > 3 else "http://127.0.0.1:8000"
+    asyncio.run(run(connections, messages, base_url))
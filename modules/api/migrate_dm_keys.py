@@ -0,0 +1,98 @@
+import asyncio
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+from app.core.database import engine, init_db
+
+async def migrate():
+    # Adds dm_key and keys every pair that has a single live DM (see MIGRATIONS)
+    await init_db()
+
+    async with engine.begin() as conn:
+        # Live two-person DMs per pair; the keeper is the already-keyed one, else the oldest
+        await conn.execute(text("""
+            CREATE TEMP TABLE dm_groups ON COMMIT DROP AS
+            SELECT conversation_id, pair_key, cleared_seq,
+                   FIRST_VALUE(conversation_id) OVER (
+                       PARTITION BY pair_key ORDER BY dm_key IS NULL, created_at, conversation_id
+                   ) AS keeper_id
+            FROM (
+                SELECT c.id AS conversation_id, c.dm_key, c.created_at, c.cleared_seq,
+                       MIN(p.user_id::text) || ':' || MAX(p.user_id::text) AS pair_key,
+                       COUNT(*) OVER (PARTITION BY MIN(p.user_id::text) || ':' || MAX(p.user_id::text)) AS dms
+                FROM conversations c JOIN conversation_participants p ON p.conversation_id = c.id
+                WHERE c.type = 'DIRECT' AND c.deleted_at IS NULL
+                GROUP BY c.id HAVING COUNT(*) = 2
+            ) pairs
+            WHERE dms > 1
+        """))
+
+        # Visible messages of each group, renumbered after the keeper's cleared range in send order.
+        # Cleared messages stay behind and are purged with their conversation.
+        await conn.execute(text("""
+            CREATE TEMP TABLE dm_messages ON COMMIT DROP AS
+            SELECT m.id, g.conversation_id, g.keeper_id, m.seq AS old_seq,
+                   k.cleared_seq + ROW_NUMBER() OVER (PARTITION BY g.keeper_id ORDER BY m.timestamp, m.id) AS new_seq
+            FROM dm_groups g
+            JOIN dm_groups k ON k.conversation_id = g.keeper_id
+            JOIN messages m ON m.conversation_id = g.conversation_id AND m.seq > g.cleared_seq
+        """))
+
+        # Watermark: the newest renumbered message the user had read in its original conversation
+        result = await conn.execute(text("""
+            UPDATE conversation_participants kp
+            SET last_read_seq = GREATEST(k.cleared_seq, COALESCE((
+                SELECT MAX(dm.new_seq) FROM dm_messages dm
+                JOIN conversation_participants op ON op.conversation_id = dm.conversation_id AND op.user_id = kp.user_id
+                WHERE dm.keeper_id = k.conversation_id AND dm.old_seq <= op.last_read_seq
+            ), 0))
+            FROM dm_groups k
+            WHERE k.conversation_id = k.keeper_id AND kp.conversation_id = k.conversation_id
+        """))
+        print(f"Recomputed read watermarks on {result.rowcount} participants.")
+
+        result = await conn.execute(text("""
+            UPDATE messages m
+            SET conversation_id = dm.keeper_id, seq = dm.new_seq
+            FROM dm_messages dm
+            WHERE dm.id = m.id
+        """))
+        print(f"Moved {result.rowcount} messages into surviving DMs.")
+
+        await conn.execute(text("""
+            UPDATE conversations c
+            SET last_seq = GREATEST(c.cleared_seq, COALESCE(last.seq, 0)),
+                last_message_id = last.id,
+                last_message_preview = CASE WHEN length(last.content) > 50 THEN left(last.content, 50) || '...' ELSE last.content END,
+                last_message_sender_id = last.sender_id,
+                last_message_at = last.timestamp,
+                updated_at = GREATEST(c.updated_at, COALESCE(last.timestamp, c.updated_at))
+            FROM dm_groups k
+            LEFT JOIN LATERAL (
+                SELECT id, seq, content, sender_id, timestamp FROM messages
+                WHERE conversation_id = k.conversation_id AND seq > k.cleared_seq
+                ORDER BY seq DESC LIMIT 1
+            ) last ON TRUE
+            WHERE k.conversation_id = k.keeper_id AND c.id = k.conversation_id
+        """))
+
+        # The purge job removes the emptied duplicates and whatever cleared messages they still hold
+        result = await conn.execute(text("""
+            UPDATE conversations c
+            SET deleted_at = now() AT TIME ZONE 'utc', dm_key = NULL
+            FROM dm_groups g
+            WHERE g.conversation_id <> g.keeper_id AND c.id = g.conversation_id
+        """))
+        print(f"Merged away {result.rowcount} duplicate DMs.")
+
+        result = await conn.execute(text("""
+            UPDATE conversations c
+            SET dm_key = g.pair_key
+            FROM dm_groups g
+            WHERE g.conversation_id = g.keeper_id AND c.id = g.conversation_id AND c.dm_key IS NULL
+        """))
+        print(f"Keyed {result.rowcount} merged DMs.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
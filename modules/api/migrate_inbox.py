@@ -0,0 +1,30 @@
+import asyncio
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+from app.core.database import engine, init_db
+
+async def migrate():
+    # Adds the last-message columns (see MIGRATIONS); unread counts come from the read watermarks
+    await init_db()
+
+    async with engine.begin() as conn:
+        # Last message per conversation
+        result = await conn.execute(text("""
+            UPDATE conversations c
+            SET last_message_id = m.id,
+                last_message_preview = CASE WHEN length(m.content) > 50 THEN left(m.content, 50) || '...' ELSE m.content END,
+                last_message_sender_id = m.sender_id,
+                last_message_at = m.timestamp
+            FROM (
+                SELECT DISTINCT ON (conversation_id) id, conversation_id, content, sender_id, timestamp
+                FROM messages
+                ORDER BY conversation_id, timestamp DESC
+            ) m
+            WHERE m.conversation_id = c.id
+        """))
+        print(f"Backfilled last message on {result.rowcount} conversations.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
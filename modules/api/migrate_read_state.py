@@ -0,0 +1,43 @@
+import asyncio
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+from app.core.database import engine, init_db
+
+async def migrate():
+    # Adds the seq / watermark columns (see MIGRATIONS)
+    await init_db()
+
+    async with engine.begin() as conn:
+        # Number existing messages per conversation in send order
+        result = await conn.execute(text("""
+            UPDATE messages m
+            SET seq = numbered.seq
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY conversation_id ORDER BY timestamp, id) AS seq
+                FROM messages
+            ) numbered
+            WHERE numbered.id = m.id AND m.seq = 0
+        """))
+        print(f"Numbered {result.rowcount} messages.")
+
+        result = await conn.execute(text("""
+            UPDATE conversations c
+            SET last_seq = COALESCE((SELECT MAX(seq) FROM messages m WHERE m.conversation_id = c.id), 0)
+        """))
+        print(f"Set last_seq on {result.rowcount} conversations.")
+
+        # Watermark = newest message the participant sent or has read per the legacy status column
+        result = await conn.execute(text("""
+            UPDATE conversation_participants p
+            SET last_read_seq = COALESCE((
+                SELECT MAX(m.seq) FROM messages m
+                WHERE m.conversation_id = p.conversation_id
+                  AND (m.sender_id = p.user_id OR m.status = 'read')
+            ), 0)
+        """))
+        print(f"Set read watermarks on {result.rowcount} participants.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
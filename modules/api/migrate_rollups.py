@@ -0,0 +1,33 @@
+import asyncio
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+from app.core.database import engine, async_session
+from app.core.rollups import compact_rollups
+from app.models.generic import SQLModel
+
+async def migrate():
+    async with engine.begin() as conn:
+        # Ensure vote_rollups exists
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+        # Backfill minute buckets from the existing ledger.
+        # Only runs against an empty rollup table, otherwise compacted hours would double count.
+        result = await conn.execute(text("""
+            INSERT INTO vote_rollups (id, category_id, candidate_id, resolution, bucket_start, vote_count)
+            SELECT gen_random_uuid(), category_id, candidate_id, 'minute', date_trunc('minute', timestamp), COUNT(*)
+            FROM votes
+            WHERE NOT EXISTS (SELECT 1 FROM vote_rollups)
+            GROUP BY category_id, candidate_id, date_trunc('minute', timestamp)
+        """))
+        print(f"Backfilled {result.rowcount} minute buckets.")
+
+    # Fold anything past the retention window into hourly buckets
+    async with async_session() as session:
+        compacted = await compact_rollups(session)
+        await session.commit()
+        print(f"Compacted into {compacted} hourly buckets.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
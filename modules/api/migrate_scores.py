@@ -0,0 +1,32 @@
+import asyncio
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+from app.core.database import engine, init_db
+
+async def migrate():
+    # Adds the score columns (see MIGRATIONS)
+    await init_db()
+
+    async with engine.begin() as conn:
+        # Proposals that predate trending_score: all signatures treated as cast at creation
+        result = await conn.execute(text("""
+            UPDATE categories
+            SET trending_score = EXTRACT(EPOCH FROM (created_at - TIMESTAMP '2025-01-01')) / 3600 / 24
+                                 + LN(GREATEST(proposal_signatures, 1)) / LN(2)
+            WHERE trending_score = 0 AND status = 'PROPOSAL'
+        """))
+        print(f"Seeded trending score on {result.rowcount} proposals.")
+
+        # Comments that predate hot_score: likes treated as given at posting time
+        result = await conn.execute(text("""
+            UPDATE comments
+            SET hot_score = EXTRACT(EPOCH FROM (timestamp - TIMESTAMP '2025-01-01')) / 3600 / 12
+                            + LN(1 + like_count) / LN(2)
+            WHERE hot_score = 0
+        """))
+        print(f"Seeded hot score on {result.rowcount} comments.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
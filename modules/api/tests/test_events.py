@@ -0,0 +1,35 @@
+import json
+import uuid
+from app.core.cache import TTLCache
+from app.core.events import EventBus, MAX_PAYLOAD_BYTES
+
+def test_emit_runs_local_handlers_with_decoded_payload():
+    bus = EventBus()
+    seen = []
+    bus.on("block.changed", seen.append)
+    user_id = uuid.uuid4()
+    bus.emit("block.changed", user_ids=[user_id])
+    assert seen == [{"user_ids": [str(user_id)]}]
+
+def test_invalidate_pops_registered_cache_keys():
+    bus = EventBus()
+    cache = TTLCache(maxsize=10, ttl=60)
+    key = uuid.uuid4()
+    cache.set(key, "detail")
+    bus.register_cache("proposal_detail", cache)
+    bus.on("cache.invalidated", bus._invalidate_local)
+    bus.invalidate("proposal_detail", key)
+    assert cache.get(key) is None
+
+def test_pack_batches_under_notify_limit_and_spills_oversized_events():
+    bus = EventBus()
+    small = [json.dumps({"k": "vote.cast", "d": {"n": i}}) for i in range(500)]
+    huge = json.dumps({"k": "message.sent", "d": {"content": "x" * 10000}})
+    spilled = []
+    payloads = bus._pack(small + [huge], spilled)
+    assert len(payloads) > 1
+    assert all(len(p.encode()) <= MAX_PAYLOAD_BYTES for p in payloads)
+    assert [s["payload"] for s in spilled] == [huge]
+    events = [e for p in payloads for e in json.loads(p)["e"]]
+    assert len(events) == 501
+    assert events[-1] == {"s": str(spilled[0]["id"])}
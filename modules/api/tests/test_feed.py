@@ -0,0 +1,28 @@
+from datetime import datetime
+from app.core.feed import released_at, VOTE, COMMENT
+
+def test_votes_are_released_at_the_close_of_their_day():
+    now = datetime(2026, 3, 14, 15, 9, 26, 535)
+    assert released_at(VOTE, now) == datetime(2026, 3, 15)
+    assert released_at(VOTE, datetime(2026, 3, 14)) == datetime(2026, 3, 15)
+    assert released_at(COMMENT, now) == now
+
+def test_merge_keeps_one_copy_newest_first_and_flags_more():
+    from collections import namedtuple
+    from app.routers.feed import merge_page
+    Row = namedtuple("Row", "id created_at")
+    a, b, c = (Row(i, datetime(2026, 3, 14, 12, i)) for i in (1, 2, 3))
+    page, more = merge_page([a, c], [b, c], 2)
+    assert page == [c, b] and more
+    page, more = merge_page([a], [b], 5)
+    assert page == [b, a] and not more
+
+def test_pull_reads_every_followed_actor_left_unpushed_by_fan_out():
+    import uuid
+    from sqlalchemy.dialects import postgresql
+    from app.routers.feed import pulled_activities
+    sql = str(pulled_activities(uuid.uuid4(), 20).compile(dialect=postgresql.dialect()))
+    assert "NOT activities.pushed" in sql
+    assert "activities.fanned_out_at IS NOT NULL" in sql
+    # Hot-or-not was decided at fan-out; a later follower count must not hide old activity
+    assert "follower_count" not in sql
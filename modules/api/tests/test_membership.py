@@ -0,0 +1,28 @@
+import asyncio
+import uuid
+from app.core.membership import MembershipCache, _on_conversation_event, membership
+from app.models.generic import ConversationRole
+
+def test_cached_role_is_served_without_a_query():
+    cache = MembershipCache(maxsize=10, ttl=60)
+    user_id, conversation_id = uuid.uuid4(), uuid.uuid4()
+    cache._cache.set((user_id, conversation_id), ConversationRole.ADMIN)
+    # No session: a cache miss would fail here
+    assert asyncio.run(cache.role(None, conversation_id, user_id)) == ConversationRole.ADMIN
+
+def test_invalidate_single_members_or_whole_conversation():
+    cache = MembershipCache(maxsize=10, ttl=60)
+    a, b = uuid.uuid4(), uuid.uuid4()
+    conversation_id, other = uuid.uuid4(), uuid.uuid4()
+    for key in [(a, conversation_id), (b, conversation_id), (a, other)]:
+        cache._cache.set(key, ConversationRole.MEMBER)
+    cache.invalidate(conversation_id, a)
+    assert cache._cache.keys() == [(b, conversation_id), (a, other)]
+    cache.invalidate(conversation_id)
+    assert cache._cache.keys() == [(a, other)]
+
+def test_conversation_deleted_event_drops_members():
+    user_id, conversation_id = uuid.uuid4(), uuid.uuid4()
+    membership._cache.set((user_id, conversation_id), ConversationRole.MEMBER)
+    _on_conversation_event({"type": "conversation.deleted", "conversation_id": str(conversation_id)})
+    assert (user_id, conversation_id) not in membership._cache
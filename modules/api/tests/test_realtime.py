@@ -0,0 +1,68 @@
+from app.core.realtime import PubSub, Subscriber
+
+def test_publish_fans_out_to_topic_subscribers_only():
+    bus = PubSub()
+    a, b, other = Subscriber(), Subscriber(), Subscriber()
+    bus.subscribe("conversation:1", a)
+    bus.subscribe("conversation:1", b)
+    bus.subscribe("conversation:2", other)
+    assert bus.publish("conversation:1", {"type": "message.created"}) == 2
+    assert a.queue.get_nowait() == b.queue.get_nowait() == '{"type": "message.created"}'
+    assert other.queue.empty()
+
+def test_slow_subscriber_is_cut_off_when_queue_fills():
+    bus = PubSub()
+    slow = Subscriber(maxsize=2)
+    bus.subscribe("t", slow)
+    for i in range(3):
+        bus.publish("t", {"n": i})
+    assert slow.overflowed
+    assert slow.queue.get_nowait() is None
+    assert slow.queue.empty()
+
+def test_extend_and_unsubscribe_all():
+    bus = PubSub()
+    sub = Subscriber()
+    bus.subscribe("user:1", sub)
+    bus.extend("user:1", "conversation:9")
+    assert bus.subscriber_count("conversation:9") == 1
+    bus.unsubscribe_all(sub)
+    assert bus.subscriber_count() == 0
+    assert bus.publish("conversation:9", {"type": "x"}) == 0
+
+def test_retract_detaches_a_users_sockets_from_a_topic():
+    bus = PubSub()
+    sub = Subscriber()
+    bus.subscribe("user:1", sub)
+    bus.extend("user:1", "conversation:9")
+    bus.retract("user:1", "conversation:9")
+    assert bus.subscriber_count("conversation:9") == 0
+    assert bus.subscriber_count("user:1") == 1
+
+def test_pump_pings_on_schedule_while_the_outbox_is_busy(monkeypatch):
+    import asyncio
+    from app.routers import gateway
+
+    class FakeSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_text(self, payload):
+            self.sent.append(payload)
+
+    async def run():
+        socket, sub = FakeSocket(), Subscriber()
+
+        async def produce():
+            for i in range(40):
+                sub.offer(f'{{"n": {i}}}')
+                await asyncio.sleep(0.005)
+
+        pump = asyncio.create_task(gateway._pump(socket, sub))
+        await produce()
+        pump.cancel()
+        return socket.sent
+
+    monkeypatch.setattr(gateway, "HEARTBEAT_INTERVAL_SECONDS", 0.05)
+    sent = asyncio.run(run())
+    assert sent.count('{"type":"ping"}') >= 2
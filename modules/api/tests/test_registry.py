@@ -0,0 +1,44 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from app.core.registry import CategoryRegistry
+
+now = datetime.utcnow()
+
+def make_registry(status="ACTIVE", start=now - timedelta(days=1), end=now + timedelta(days=1)):
+    registry = CategoryRegistry()
+    category_id = uuid.uuid4()
+    candidate_id = uuid.uuid4()
+    registry.upsert_category(category_id, status, start, end)
+    registry.add_candidate(category_id, candidate_id)
+    return registry, category_id, candidate_id
+
+def test_valid_ballot_passes():
+    registry, category_id, candidate_id = make_registry()
+    assert registry.knows(category_id, candidate_id)
+    registry.validate_ballot(category_id, candidate_id, now)
+
+def test_unknown_category_is_rejected():
+    registry, _, candidate_id = make_registry()
+    with pytest.raises(HTTPException) as exc:
+        registry.validate_ballot(uuid.uuid4(), candidate_id, now)
+    assert exc.value.status_code == 404
+
+def test_candidate_from_another_category_is_rejected():
+    registry, category_id, _ = make_registry()
+    with pytest.raises(HTTPException) as exc:
+        registry.validate_ballot(category_id, uuid.uuid4(), now)
+    assert exc.value.status_code == 400
+
+def test_closed_window_is_rejected():
+    registry, category_id, candidate_id = make_registry(end=now - timedelta(minutes=1))
+    with pytest.raises(HTTPException) as exc:
+        registry.validate_ballot(category_id, candidate_id, now)
+    assert exc.value.status_code == 403
+
+def test_proposal_status_is_rejected():
+    registry, category_id, candidate_id = make_registry(status="PROPOSAL")
+    with pytest.raises(HTTPException) as exc:
+        registry.validate_ballot(category_id, candidate_id, now)
+    assert exc.value.status_code == 403
@@ -0,0 +1,22 @@
+import uuid
+from app.core.user_index import PrefixIndex
+
+def test_prefix_search_is_case_insensitive_and_alphabetical():
+    index = PrefixIndex()
+    ids = [uuid.uuid4() for _ in range(4)]
+    index.upsert(ids[0], "Maria", "maria@x.test", "INDIVIDUAL", False)
+    index.upsert(ids[1], "marcus", "marcus@x.test", "INDIVIDUAL", False)
+    index.upsert(ids[2], None, "mark@x.test", "ORGANIZATION", True)
+    index.upsert(ids[3], "Zoe", "zoe@x.test", "INDIVIDUAL", False)
+    assert [c["name"] for c in index.search("MAR", 10)] == ["marcus", "Maria", "mark"]
+    assert [c["name"] for c in index.search("mar", 2)] == ["marcus", "Maria"]
+    assert index.search("mar", 10, exclude={str(ids[1])})[0]["name"] == "Maria"
+
+def test_rename_moves_the_entry():
+    index = PrefixIndex()
+    user_id = uuid.uuid4()
+    index.upsert(user_id, "Alice", "alice@x.test", "INDIVIDUAL", False)
+    index.upsert(user_id, "Bob", "alice@x.test", "INDIVIDUAL", False)
+    assert index.search("ali", 10) == []
+    assert index.search("bo", 10)[0]["id"] == str(user_id)
+    assert len(index) == 1